@@ -1,3 +1,4 @@
+import asyncio
 import time
 from lib.displays import get_displays
 from lib.state import ApplicationState
@@ -9,12 +10,23 @@ from lib.rtc import RTC
 from lib.housekeeper import Housekeeper
 from lib.location import Location
 from lib.logger import Logger
+from lib.display_manager import DisplayManager
+from lib.runtime import Runtime, sleep_ms
+from lib.second_ticker import SecondTicker
+from lib.instrumentation import Instrumentation
+
+TIMING_SUMMARY_MS = 5 * 60 * 1000
+ANIMATION_IDLE_MS = 500  # how often to look again while nothing animates
 
 class Application:
     def __init__(self, settings: Settings):
         self.settings = settings
 
-        self.time_display_painter, self.stat_display_painter = get_displays()
+        self.time_display_painter, self.stat_display_painter = get_displays(self.settings)
+        # painters are only invoked when their refresh policy is due and the state they show has changed
+        self.displays = DisplayManager()
+        self.time_display_gate = self.displays.add(self.time_display_painter, self.settings.time_display_refresh)
+        self.stat_display_gate = self.displays.add(self.stat_display_painter, self.settings.stat_display_refresh)
 
         self.state = ApplicationState()
         self.logger = Logger(self.settings)
@@ -22,36 +34,90 @@ class Application:
         self.rtc = RTC()
         self.ntp = NTP()
         self.location = Location(self.logger)
-        self.housekeeper = Housekeeper()
+        self.timings = Instrumentation()
+        self.housekeeper = Housekeeper(timings=self.timings)
         self.weather = Weather(self.settings, self.logger)
 
+        # every service is its own task; the network ones are awaited, so a
+        # fetch in flight does not hold up the clock
+        self.runtime = Runtime(self.timings)
+        # the clock renders once per second, right after the RTC's second edge
+        self.ticker = SecondTicker(lambda: self.rtc.get_time()[6])
+        self.runtime.spawn("ui", self.clock_loop)
+        self.runtime.spawn("animation", self.animation_loop)
+        self.runtime.every("wifi", 1000, lambda: self.wifi.act(self.state))
+        # network jobs are spread out by jitter; a failing NTP sync retries
+        # with backoff instead of stopping the clock
+        self.runtime.every_async("ntp", 1000, lambda: self.ntp.act(self.state), jitter_ms=200, backoff_max_ms=60_000)
+        self.runtime.every_async("location", 1000, lambda: self.location.act(self.state), jitter_ms=200)
+        self.runtime.every_async("weather", 1000, lambda: self.weather.act(self.state), jitter_ms=200)
+        self.runtime.every_async("logger", 1000, self.logger.flush, jitter_ms=200)
+        self.runtime.every("housekeeper", 5000, self.housekeeper.act)
+        self.runtime.every("timings", TIMING_SUMMARY_MS, self.log_timings)
+
         self.logger.info("Application initialized")
 
+    async def clock_loop(self):
+        while True:
+            await self.ticker.wait_edge()
+            t0 = time.ticks_us()
+            self.rtc.act(self.state)
+            self.render_ui()  # returns once the frames are flushed
+            self.timings.record("render", time.ticks_diff(time.ticks_us(), t0))
+            self.ticker.record_flush()
+            self.timings.record("clock_lag", self.ticker.lag_last_us)
+            # garbage is collected in the idle time before the next edge
+            self.housekeeper.after_frame(1000 - self.ticker.lag_last_us // 1000 - self.ticker.guard_ms)
+
+    async def animation_loop(self):
+        # hardware-scrolled widgets are fed between frames, on the panel's own scroll clock
+        while True:
+            t0 = time.ticks_us()
+            delay = self.displays.animate()
+            if delay is None:
+                delay = ANIMATION_IDLE_MS
+            else:
+                self.timings.record("animate", time.ticks_diff(time.ticks_us(), t0))
+            await sleep_ms(delay)
+
     def render_ui(self):
-        self.time_display_painter.draw(self.state)
-        self.stat_display_painter.draw(self.state)
+        self.displays.render(self.state)
+
+    def render_stats(self) -> list:
+        """Draw/skip counters per display, e.g. to confirm how many frames are skipped"""
+        return self.displays.stats()
+
+    def dump_timings(self):
+        """Print the per-service timing histograms on the serial console"""
+        self.timings.dump()
+
+    def log_timings(self):
+        # the first call comes right at start up, with nothing recorded yet
+        if self.timings.histograms:
+            self.dump_timings()
+            self.logger.info("Timing summary", **self.timings.summary())
+            self.timings.reset()
+            self.housekeeper.request_report(lambda report: self.logger.info("Memory summary", **report))
+
+    def clock_stats(self) -> dict:
+        """Lag between the RTC's second edge and the flushed frame, see SecondTicker"""
+        return self.ticker.stats()
 
     def run(self):
         try:
             self.logger.info("Application started, entering main loop")
-            while True:
-                self.wifi.act(self.state)
-                self.rtc.act(self.state)
-                self.ntp.act(self.state)
-                self.location.act(self.state)
-                self.weather.act(self.state)
-                self.render_ui()
-                self.housekeeper.act()
-                time.sleep(0.1)
+            asyncio.run(self.runtime.main())
         except KeyboardInterrupt:
             self.logger.info("Received shutdown signal")
             print("\nShutting down gracefully...")
             # Cleanup: turn off display, disconnect WiFi, etc.
+            self.displays.close()
             self.wifi.wlan.disconnect()
             self.wifi.wlan.active(False)
         except Exception as e:
             self.logger.error("Application error", error=str(e))
             raise
         finally:
+            self.dump_timings()  # what was recorded since the last summary
             self.logger.info("Cleanup complete")
             print("Cleanup complete")
@@ -1,5 +1,4 @@
-import urequests
-import ujson
+from lib import http
 from lib.state import ApplicationState
 from lib.settings import Settings
 
@@ -24,7 +23,7 @@ class CalendarService:
         else:
             print(f"Calendar: {message}")
 
-    def act(self, state: ApplicationState):
+    async def act(self, state: ApplicationState):
         # Only proceed if wifi is connected
         if not state.wifiConnected:
             self.fetchDone = False  # resync when wifi is back
@@ -32,10 +31,10 @@ class CalendarService:
 
         # Only fetch once per day (or when not yet fetched)
         if not self.fetchDone:
-            self._fetch_calendar_events(state)
+            await self._fetch_calendar_events(state)
             self.fetchDone = True
 
-    def _fetch_calendar_events(self, state: ApplicationState):
+    async def _fetch_calendar_events(self, state: ApplicationState):
         """
         Fetches today's calendar events from the Cloudflare Worker proxy.
         """
@@ -48,13 +47,14 @@ class CalendarService:
 
             self._log("info", "Fetching calendar events from worker")
 
-            response = urequests.get(url, timeout=10)
+            response = await http.get(url, timeout=10)
 
             if response.status_code == 200:
-                data = ujson.loads(response.text)
+                data = response.json()
 
                 if "eventCount" in data:
                     state.eventCount = data["eventCount"]
+                    state.eventTitles = data.get("eventTitles", [])
 
                     self._log("info", "Calendar events fetched",
                              event_count=state.eventCount,
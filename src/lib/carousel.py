@@ -0,0 +1,118 @@
+import time
+from lib.render_gate import RenderGate
+from lib.state import ApplicationState
+from lib.widgets import Layer
+
+class PageLayer(Layer):
+    """
+    Off-screen stand-in for a display that painters draw into. While its
+    page is shown, show() copies it onto the real display and the hardware
+    scroll calls go through to the display; the scroll a hidden page asks
+    for is kept until it is shown.
+    """
+
+    def __init__(self, width, height):
+        super().__init__(width, height)
+        self.target = None  # the display, while this page is shown
+        self.scroll = None  # set_scroll() arguments of the page, None for no scroll
+
+    def attach(self, display):
+        """Show this page on display, with its scroll"""
+        self.target = display
+        display.clear_scroll()
+        if self.scroll is not None:
+            display.set_scroll(*self.scroll)
+        display.buffer[:] = self.buffer
+        display.show()
+
+    def detach(self):
+        self.target = None
+
+    def show(self):
+        if self.target is not None:
+            self.target.buffer[:] = self.buffer
+            self.target.show()
+
+    def set_scroll(self, page0, page1, interval=0, left=True):
+        self.scroll = (page0, page1, interval, left)
+        if self.target is not None:
+            self.target.set_scroll(page0, page1, interval, left)
+
+    def clear_scroll(self):
+        self.scroll = None
+        if self.target is not None:
+            self.target.clear_scroll()
+
+    def scroll_clock(self):
+        return None if self.target is None else self.target.scroll_clock()
+
+    def scroll_step_us(self) -> int:
+        return self.target.scroll_step_us()
+
+    def write_window(self, page0, page1, col0, col1, rows):
+        if self.target is not None:
+            self.target.write_window(page0, page1, col0, col1, rows)
+
+    def contrast(self, contrast):
+        pass
+
+    def wait(self):
+        pass
+
+    def invalidate(self):
+        pass
+
+
+class PageCarousel:
+    """
+    Rotates several painters on one display, switching every `seconds`.
+    Each page is painted into its own PageLayer, and only when the part of
+    the state it shows changes, so switching pages is one buffer copy and a
+    flush of what differs from the page shown before. A switch stops the
+    hardware scroll of the page going away and starts the new page's.
+    """
+
+    def __init__(self, display, painter_classes, seconds=10, contrast=None):
+        self.display = display
+        self.contrast = contrast
+        self.interval_ms = int(seconds * 1000)
+        self.gates = [RenderGate(painter_class(PageLayer(display.width, display.height)))
+                      for painter_class in painter_classes]
+        self.started = time.ticks_ms()
+        self.shown = None  # index of the page in the display buffer
+        self.switches = 0
+
+    def page_index(self) -> int:
+        return time.ticks_diff(time.ticks_ms(), self.started) // self.interval_ms % len(self.gates)
+
+    def invalidate(self):
+        for gate in self.gates:
+            gate.painter.invalidate()
+            gate.invalidate()
+        if self.shown is not None:
+            self.gates[self.shown].painter.display.detach()
+        self.shown = None
+
+    def fingerprint(self, state: ApplicationState) -> tuple:
+        return (self.page_index(),) + tuple(gate.painter.fingerprint(state) for gate in self.gates)
+
+    def draw(self, state: ApplicationState):
+        if self.contrast is not None:
+            self.display.contrast(self.contrast)
+        index = self.page_index()
+        switch = index != self.shown
+        if switch and self.shown is not None:
+            self.gates[self.shown].painter.display.detach()
+        # keep every page current, so a switch never waits for painting; the
+        # shown page's show() goes to the display
+        for gate in self.gates:
+            gate.draw(state)
+        if switch:
+            self.shown = index
+            self.switches += 1
+            self.gates[index].painter.display.attach(self.display)
+
+    def animate(self):
+        if self.shown is None:
+            return None
+        return self.gates[self.shown].painter.animate()
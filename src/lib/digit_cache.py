@@ -0,0 +1,61 @@
+import framebuf
+
+class DigitSpriteCache:
+    """
+    Pre-rendered seven-segment glyphs. Each (glyph, width, height, thickness)
+    combination is rendered once into a FrameBuffer on first use and blitted
+    from then on. Holds at most max_entries sprites, evicting the least
+    recently used one.
+    """
+
+    GLYPHS = "0123456789-C°:"
+
+    def __init__(self, render, max_entries=32):
+        # render(fbuf, glyph, x, y, width, height, thickness) draws a glyph
+        self.render = render
+        self.max_entries = max_entries
+        self.entries = {}  # (glyph, width, height, thickness) -> [fbuf, buf, last_used]
+        self.clock = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, glyph, width, height, thickness):
+        """Return the sprite for the glyph, or None if it has no segments (e.g. a space)"""
+        if glyph not in self.GLYPHS:
+            return None
+        self.clock += 1
+        key = (glyph, width, height, thickness)
+        entry = self.entries.get(key)
+        if entry is not None:
+            entry[2] = self.clock
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        if len(self.entries) >= self.max_entries:
+            self._evict()
+        buf = bytearray(((width + 7) // 8) * height)
+        sprite = framebuf.FrameBuffer(buf, width, height, framebuf.MONO_HLSB)
+        self.render(sprite, glyph, 0, 0, width, height, thickness)
+        self.entries[key] = [sprite, buf, self.clock]
+        return sprite
+
+    def memory_footprint(self) -> int:
+        """Bytes held by the sprite buffers"""
+        total = 0
+        for entry in self.entries.values():
+            total += len(entry[1])
+        return total
+
+    def clear(self):
+        self.entries = {}
+
+    def _evict(self):
+        oldest_key = None
+        oldest = self.clock
+        for key, entry in self.entries.items():
+            if entry[2] < oldest:
+                oldest = entry[2]
+                oldest_key = key
+        if oldest_key is not None:
+            del self.entries[oldest_key]
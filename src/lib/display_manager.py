@@ -0,0 +1,79 @@
+import time
+from lib.render_gate import RenderGate
+from lib.refresh_policy import OnStateChange, refresh_policy
+from lib.state import ApplicationState
+
+class DisplayManager:
+    """
+    Renders every registered painter, then waits for all panels to finish
+    flushing before the next frame. With double-buffered displays each
+    show() only hands the frame to that display's flusher thread, so the
+    transfers on the independent I2C buses run concurrently.
+
+    Each display has a refresh policy (see refresh_policy.py) deciding on
+    which loop iterations it is looked at, so a rarely changing panel
+    costs nothing between its checks.
+    """
+
+    def __init__(self):
+        self.gates = []
+        self.policies = []
+        self.deferred = []  # iterations skipped by the policy, per display
+
+    def add(self, painter, policy=None) -> RenderGate:
+        gate = RenderGate(painter)
+        self.gates.append(gate)
+        self.policies.append(refresh_policy(policy) if policy is not None else OnStateChange())
+        self.deferred.append(0)
+        return gate
+
+    def set_policy(self, gate: RenderGate, policy):
+        index = self.gates.index(gate)
+        self.policies[index] = refresh_policy(policy)
+        gate.invalidate()
+
+    def render(self, state: ApplicationState):
+        now = time.ticks_ms()
+        # draw all due panels first, so their transfers start back to back
+        drawn = []
+        for index, gate in enumerate(self.gates):
+            if not self.policies[index].due(state, now):
+                self.deferred[index] += 1
+                continue
+            if gate.draw(state):
+                drawn.append(gate)
+        for gate in drawn:
+            gate.painter.display.wait()
+
+    def animate(self):
+        """Animate every painter between frames, returns ms until the next call is due or None"""
+        delay = None
+        for gate in self.gates:
+            if hasattr(gate.painter, "animate"):
+                due = gate.painter.animate()
+                if due is not None and (delay is None or due < delay):
+                    delay = due
+        return delay
+
+    def wait(self):
+        for gate in self.gates:
+            gate.painter.display.wait()
+
+    def invalidate(self):
+        for gate in self.gates:
+            gate.painter.display.invalidate()
+            gate.painter.invalidate()
+            gate.invalidate()
+        for policy in self.policies:
+            policy.reset()
+
+    def close(self):
+        for gate in self.gates:
+            display = gate.painter.display
+            if hasattr(display, "stop_flusher"):
+                display.stop_flusher()
+
+    def stats(self) -> list:
+        return [{"painter": type(gate.painter).__name__, "policy": type(self.policies[index]).__name__,
+                 "draws": gate.draws, "skips": gate.skips, "deferred": self.deferred[index]}
+                for index, gate in enumerate(self.gates)]
@@ -1,14 +1,45 @@
-from machine import Pin, I2C
-from lib.ssd1306 import SSD1306_I2C
+from machine import Pin, I2C, SPI
+from lib.ssd1306 import SSD1306_I2C, SSD1306_SPI
 from lib.ui import Time_Display_Painter, Stat_Display_Painter, Temp_Display_Painter
+from lib.carousel import PageCarousel
+from lib.constants import DISPLAY_CONTRAST
 
-def get_displays():
-    # SCL -> A5 -> GPIO12, SDA -> A4 -> GPIO11
-    i2c_time_display = I2C(0, scl=Pin(12), sda=Pin(11))
-    # SCL -> A1 -> GPIO2, SDA -> A2 -> GPIO3
-    i2c_temp_display = I2C(1, scl=Pin(2), sda=Pin(3))
+_spi = None
 
-    time_display_painter = Time_Display_Painter(SSD1306_I2C(128, 64, i2c_time_display))
-    stat_display_painter = Temp_Display_Painter(SSD1306_I2C(128, 64, i2c_temp_display))
+def get_spi(settings):
+    global _spi
+    if _spi is None:
+        # both SPI panels share SCK and MOSI, each has its own DC, RES and CS
+        pins = settings.spi_pins
+        _spi = SPI(1, baudrate=settings.spi_freq, polarity=0, phase=0, sck=Pin(pins["sck"]), mosi=Pin(pins["mosi"]))
+    return _spi
+
+def spi_display(settings, pins):
+    dc, res, cs = pins
+    return SSD1306_SPI(128, 64, get_spi(settings), Pin(dc), Pin(res), Pin(cs), baudrate=settings.spi_freq)
+
+def get_displays(settings, double_buffer=True):
+    # with double buffering each I2C panel is flushed from its own thread, so
+    # both buses transfer at the same time; SPI panels flush fast enough
+    # to be sent inline
+    if settings.time_display_bus == "spi":
+        time_display = spi_display(settings, settings.time_display_spi_pins)
+    else:
+        # SCL -> A5 -> GPIO12, SDA -> A4 -> GPIO11
+        i2c_time_display = I2C(0, scl=Pin(12), sda=Pin(11), freq=settings.time_display_freq)
+        time_display = SSD1306_I2C(128, 64, i2c_time_display, double_buffer=double_buffer)
+
+    if settings.stat_display_bus == "spi":
+        stat_display = spi_display(settings, settings.stat_display_spi_pins)
+    else:
+        # SCL -> A1 -> GPIO2, SDA -> A2 -> GPIO3
+        i2c_temp_display = I2C(1, scl=Pin(2), sda=Pin(3), freq=settings.stat_display_freq)
+        stat_display = SSD1306_I2C(128, 64, i2c_temp_display, double_buffer=double_buffer)
+
+    time_display_painter = Time_Display_Painter(time_display)
+    # the second panel rotates through the temperature and stat pages
+    stat_display_painter = PageCarousel(stat_display, [Temp_Display_Painter, Stat_Display_Painter],
+                                        settings.stat_display_page_seconds,
+                                        DISPLAY_CONTRAST)
 
     return time_display_painter, stat_display_painter
@@ -0,0 +1,130 @@
+# Packed binary font atlas, read from flash on demand.
+#
+# File layout (little endian), written by util/font_to_atlas.py:
+#   header  "FNTA", version u8, height u8, max_width u8, flags u8,
+#           min_ch u16, max_ch u16, glyph_count u16, max_record u16
+#   index   glyph_count + 1 u32 offsets of the glyph records, relative to
+#           the end of the index
+#   records width u16 followed by the glyph bitmap, as font_to_py lays
+#           them out; record 0 is the glyph for unsupported characters
+#
+# FontAtlas has the same interface as a font_to_py module, so it can be
+# passed to Writer. get_ch() returns a memoryview into a small pool of
+# glyph slots, valid until the glyph is evicted.
+
+import struct
+
+MAGIC = b"FNTA"
+VERSION = 1
+HEADER_FORMAT = "<4sBBBBHHHH"
+HEADER_SIZE = 16
+
+FLAG_HMAP = 1
+FLAG_REVERSE = 2
+FLAG_MONOSPACED = 4
+
+def font_path(name):
+    """Path of a font atlas shipped next to this module"""
+    parts = __file__.rsplit("/", 1)
+    return name if len(parts) == 1 else parts[0] + "/" + name
+
+class FontAtlas:
+    def __init__(self, path, cache_size=16):
+        self.path = path
+        self.cache_size = cache_size
+        self.file = None  # opened on first use
+
+    def _open(self):
+        file = open(self.path, "rb")
+        magic, version, self._height, self._max_width, self.flags, self.min, self.max, count, max_record = \
+            struct.unpack(HEADER_FORMAT, file.read(HEADER_SIZE))
+        if magic != MAGIC or version != VERSION:
+            file.close()
+            raise ValueError("Not a font atlas: " + self.path)
+        index = file.read(4 * (count + 1))
+        self.offsets = [struct.unpack_from("<I", index, 4 * i)[0] for i in range(count + 1)]
+        self.data_start = HEADER_SIZE + len(index)
+        self.record_size = max_record
+        self.pool = bytearray(self.cache_size * max_record)
+        self.view = memoryview(self.pool)
+        self.slots = {}  # glyph number -> [slot, record size, last_used]
+        self.clock = 0
+        self.loads = 0
+        self.file = file
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def height(self):
+        if self.file is None:
+            self._open()
+        return self._height
+
+    def max_width(self):
+        if self.file is None:
+            self._open()
+        return self._max_width
+
+    def hmap(self):
+        if self.file is None:
+            self._open()
+        return bool(self.flags & FLAG_HMAP)
+
+    def reverse(self):
+        if self.file is None:
+            self._open()
+        return bool(self.flags & FLAG_REVERSE)
+
+    def monospaced(self):
+        if self.file is None:
+            self._open()
+        return bool(self.flags & FLAG_MONOSPACED)
+
+    def min_ch(self):
+        if self.file is None:
+            self._open()
+        return self.min
+
+    def max_ch(self):
+        if self.file is None:
+            self._open()
+        return self.max
+
+    def get_ch(self, ch):
+        if self.file is None:
+            self._open()
+        ordch = ord(ch)
+        glyph = ordch - self.min + 1 if self.min <= ordch <= self.max else 0
+        self.clock += 1
+        entry = self.slots.get(glyph)
+        if entry is None:
+            entry = self._load(glyph)
+        else:
+            entry[2] = self.clock
+        start = entry[0] * self.record_size
+        record = self.view[start:start + entry[1]]
+        return record[2:], self._height, record[0] | (record[1] << 8)
+
+    def _load(self, glyph):
+        if len(self.slots) < self.cache_size:
+            slot = len(self.slots)
+        else:
+            # reuse the least recently used slot
+            oldest_glyph = None
+            oldest = self.clock
+            for number, entry in self.slots.items():
+                if entry[2] < oldest:
+                    oldest = entry[2]
+                    oldest_glyph = number
+            slot = self.slots.pop(oldest_glyph)[0]
+
+        size = self.offsets[glyph + 1] - self.offsets[glyph]
+        start = slot * self.record_size
+        self.file.seek(self.data_start + self.offsets[glyph])
+        self.file.readinto(self.view[start:start + size])
+        self.loads += 1
+        entry = [slot, size, self.clock]
+        self.slots[glyph] = entry
+        return entry
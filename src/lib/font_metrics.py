@@ -0,0 +1,69 @@
+class FontMetrics:
+    """
+    Per-font tables of glyph widths and printable widths (the width less any
+    blank columns on the right), built once on first use. Writer measures
+    text with them instead of fetching and scanning glyphs.
+    """
+
+    metrics = {}  # one table set per font
+
+    @staticmethod
+    def for_font(font):
+        metrics = FontMetrics.metrics.get(font)
+        if metrics is None:
+            metrics = FontMetrics(font)
+            FontMetrics.metrics[font] = metrics
+        return metrics
+
+    def __init__(self, font):
+        self.min = font.min_ch()
+        self.max = font.max_ch()
+        count = self.max - self.min + 2
+        # entry 0 is the glyph fonts return for unsupported characters
+        self.widths = bytearray(count)
+        self.truelens = bytearray(count)
+        default_ch = chr(self.min - 1) if self.min > 0 else chr(self.max + 1)
+        for i in range(count):
+            glyph, height, width = font.get_ch(default_ch if i == 0 else chr(self.min + i - 1))
+            self.widths[i] = width
+            self.truelens[i] = glyph_truelen(glyph, height, width)
+
+    def width(self, char) -> int:
+        code = ord(char)
+        return self.widths[code - self.min + 1 if self.min <= code <= self.max else 0]
+
+    def truelen(self, char) -> int:
+        code = ord(char)
+        return self.truelens[code - self.min + 1 if self.min <= code <= self.max else 0]
+
+    def stringlen(self, string) -> int:
+        length = 0
+        widths = self.widths
+        low = self.min
+        high = self.max
+        for char in string:
+            code = ord(char)
+            length += widths[code - low + 1 if low <= code <= high else 0]
+        return length
+
+
+# Return the printable width of a horizontally mapped glyph less any blank
+# columns on RHS
+def glyph_truelen(glyph, ht, wd):
+    div, mod = divmod(wd, 8)
+    gbytes = div + 1 if mod else div  # No. of bytes per row of glyph
+    mc = 0  # Max non-blank column
+    data = glyph[(wd - 1) // 8]  # Last byte of row 0
+    for row in range(ht):  # Glyph row
+        for col in range(wd - 1, -1, -1):  # Glyph column
+            gbyte, gbit = divmod(col, 8)
+            if gbit == 0:  # Next glyph byte
+                data = glyph[row * gbytes + gbyte]
+            if col <= mc:
+                break
+            if data & (1 << (7 - gbit)):  # Pixel is lit (1)
+                mc = col  # Eventually gives rightmost lit pixel
+                break
+        if mc + 1 == wd:
+            break  # All done: no trailing space
+    return mc + 1
@@ -0,0 +1,59 @@
+import framebuf
+
+class GlyphCache:
+    """
+    Ready-to-blit FrameBuffers of one font's glyphs, keyed by character.
+    Holds at most max_entries glyphs; the least recently used one is evicted
+    when a new glyph does not fit. A hit allocates nothing.
+    """
+
+    caches = {}  # one cache per font
+
+    @staticmethod
+    def for_font(font, max_entries=48):
+        cache = GlyphCache.caches.get(font)
+        if cache is None:
+            cache = GlyphCache(font, max_entries)
+            GlyphCache.caches[font] = cache
+        return cache
+
+    def __init__(self, font, max_entries=48):
+        self.font = font
+        self.max_entries = max_entries
+        # same mapping Writer uses for the font
+        self.map = framebuf.MONO_HMSB if font.reverse() else framebuf.MONO_HLSB
+        self.entries = {}  # char -> [fbuf, height, width, last_used]
+        self.clock = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, char):
+        """Return [fbuf, height, width, last_used] for the char"""
+        self.clock += 1
+        entry = self.entries.get(char)
+        if entry is not None:
+            entry[3] = self.clock
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        if len(self.entries) >= self.max_entries:
+            self._evict()
+        glyph, height, width = self.font.get_ch(char)
+        buf = bytearray(glyph)  # FrameBuffer needs a writable buffer
+        entry = [framebuf.FrameBuffer(buf, width, height, self.map), height, width, self.clock]
+        self.entries[char] = entry
+        return entry
+
+    def clear(self):
+        self.entries = {}
+
+    def _evict(self):
+        oldest_char = None
+        oldest = self.clock
+        for char, entry in self.entries.items():
+            if entry[3] < oldest:
+                oldest = entry[3]
+                oldest_char = char
+        if oldest_char is not None:
+            del self.entries[oldest_char]
@@ -1,7 +1,131 @@
-from lib.util import throttle
 import gc
+import time
 
 class Housekeeper:
-    @throttle(5000)
+    """
+    Adaptive garbage collection. Collections are due every COLLECT_INTERVAL_MS
+    or as soon as free memory drops below the watermark, and are run from
+    after_frame(), in the idle slack right after the clock's frame is
+    flushed, so a pause never delays a second edge. act() only steps in when
+    frames stopped giving it the chance. gc.threshold() is set high enough
+    that MicroPython's own allocation-triggered collections become the
+    exception. Fragmentation is measured the same way, one allocation probe
+    per frame, so a report never costs more than a collection's pause.
+    """
+
+    COLLECT_INTERVAL_MS = 5000
+    PAUSE_MARGIN_MS = 20  # slack needed on top of the longest pause seen
+    # largest free block probes stop at this size: bigger blocks make no
+    # difference to the application, and zeroing one would outlast the slack
+    PROBE_LIMIT = 64 * 1024
+
+    def __init__(self, watermark=None, timings=None):
+        self.timings = timings  # Instrumentation recording the pauses as "gc"
+        self.supported = hasattr(gc, "mem_free")  # MicroPython's gc extensions
+        heap = gc.mem_free() + gc.mem_alloc() if self.supported else 0
+        self.watermark = watermark if watermark is not None else heap // 8
+        if self.supported:
+            # an automatic collection after a quarter of the heap was allocated
+            gc.threshold(heap // 4)
+        self.last_collect = time.ticks_ms()
+        self.collections = 0
+        self.forced = 0  # collections act() had to run outside the slack
+        self.pause_last_us = 0
+        self.pause_max_us = 0
+        self.pause_total_us = 0
+        self.report_to = None  # callback waiting for the next report()
+        self.probe = None  # [low, high] of the largest free block bisection in progress
+        self.largest_free = None  # result of the last bisection
+        self.probe_free = 0  # free memory when that bisection started
+
+    def request_report(self, callback):
+        """
+        Have callback(report) called once the largest free block has been
+        measured, one probe in the slack after each frame
+        """
+        self.report_to = callback
+        if self.supported:
+            self.probe = [0, min(gc.mem_free(), self.PROBE_LIMIT)]
+            self.probe_free = gc.mem_free()
+
+    def due(self) -> bool:
+        if self.supported and gc.mem_free() < self.watermark:
+            return True
+        return time.ticks_diff(time.ticks_ms(), self.last_collect) >= self.COLLECT_INTERVAL_MS
+
+    def after_frame(self, slack_ms):
+        """Call right after a flush with the ms left until the next frame is due"""
+        if slack_ms < self.pause_max_us // 1000 + self.PAUSE_MARGIN_MS:
+            return
+        # at most one collection per frame: a probe that fails collects too
+        if self.due():
+            self.collect()
+        elif self.probe is not None:
+            self.probe_step()
+        elif self.report_to is not None:
+            callback = self.report_to
+            self.report_to = None
+            callback(self.report())
+
     def act(self):
+        # fallback for when no frame left enough slack: memory running out,
+        # or no collection for several intervals
+        low = self.supported and gc.mem_free() < self.watermark // 2
+        if low or time.ticks_diff(time.ticks_ms(), self.last_collect) >= 3 * self.COLLECT_INTERVAL_MS:
+            self.forced += 1
+            self.collect()
+
+    def collect(self):
+        start = time.ticks_us()
         gc.collect()
+        pause = time.ticks_diff(time.ticks_us(), start)
+        self.last_collect = time.ticks_ms()
+        self.collections += 1
+        self.pause_last_us = pause
+        if pause > self.pause_max_us:
+            self.pause_max_us = pause
+        self.pause_total_us += pause
+        if self.timings is not None:
+            self.timings.record("gc", pause)
+
+    def probe_step(self):
+        """
+        One step of the bisection for the largest bytearray that can be
+        allocated. A failed allocation makes MicroPython collect before it
+        gives up, so steps are spread over frames, one per slack.
+        """
+        low, high = self.probe
+        size = (low + high) // 2
+        try:
+            block = bytearray(size)
+            del block
+            low = size
+        except MemoryError:
+            high = size
+        if high - low > 64:
+            self.probe = [low, high]
+        else:
+            self.probe = None
+            self.largest_free = low
+
+    def report(self) -> dict:
+        """
+        Pause times, free memory and, once measured, the fragmentation (free
+        memory vs the largest free block, up to PROBE_LIMIT); cheap enough
+        for any frame
+        """
+        report = {
+            "collections": self.collections,
+            "forced": self.forced,
+            "pause_last_us": self.pause_last_us,
+            "pause_max_us": self.pause_max_us,
+            "pause_avg_us": self.pause_total_us // self.collections if self.collections else 0,
+        }
+        if self.supported:
+            report["free"] = gc.mem_free()
+            report["allocated"] = gc.mem_alloc()
+        if self.largest_free is not None:
+            free = min(self.probe_free, self.PROBE_LIMIT)
+            report["largest_free_block"] = self.largest_free
+            report["fragmentation"] = round(1 - self.largest_free / free, 3) if free else 0
+        return report
@@ -0,0 +1,89 @@
+import asyncio
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+# Minimal HTTP/1.0 client on asyncio streams. Unlike urequests it yields to
+# the other tasks while connecting, sending and waiting for the response;
+# only the DNS lookup inside open_connection still blocks.
+
+class Response:
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode()
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        # the connection is closed once the body has been read
+        pass
+
+def split_url(url):
+    """Return (ssl, host, port, path) for an http:// or https:// URL"""
+    scheme, _, netloc, *rest = url.split("/", 3)
+    if scheme == "https:":
+        ssl = True
+        port = 443
+    elif scheme == "http:":
+        ssl = False
+        port = 80
+    else:
+        raise ValueError(f"unsupported URL: {url}")
+    host = netloc
+    if ":" in netloc:
+        host, port = netloc.split(":", 1)
+        port = int(port)
+    return ssl, host, port, "/" + (rest[0] if rest else "")
+
+async def _request(method, url, data, headers):
+    ssl, host, port, path = split_url(url)
+    if ssl:
+        reader, writer = await asyncio.open_connection(host, port, ssl=True)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        if isinstance(data, str):
+            data = data.encode()
+        lines = [f"{method} {path} HTTP/1.0", f"Host: {host}"]
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        if data is not None:
+            lines.append(f"Content-Length: {len(data)}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+        if data is not None:
+            writer.write(data)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        status_code = int(status_line.split(None, 2)[1])
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if not line or line == b"\r\n":
+                break
+            name, _, value = line.decode().partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+        # HTTP/1.0: the server closes the connection after the body
+        content = await reader.read(-1)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return Response(status_code, response_headers, content)
+
+async def request(method, url, data=None, headers=None, timeout=10) -> Response:
+    """Send a request, raises asyncio.TimeoutError after timeout seconds"""
+    return await asyncio.wait_for(_request(method, url, data, headers), timeout)
+
+async def get(url, headers=None, timeout=10) -> Response:
+    return await request("GET", url, None, headers, timeout)
+
+async def post(url, data=None, headers=None, timeout=10) -> Response:
+    return await request("POST", url, data, headers, timeout)
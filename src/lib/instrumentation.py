@@ -0,0 +1,129 @@
+import time
+
+# upper bounds of the histogram buckets in us; the last bucket takes the rest
+BUCKETS_US = (100, 300, 1_000, 3_000, 10_000, 30_000, 100_000, 300_000)
+# blocking work longer than the old main loop tick holds everything else up
+TICK_BUDGET_US = 100_000
+
+class Histogram:
+    """Fixed-bucket histogram of durations, with max and overruns of the budget"""
+
+    def __init__(self, budget_us=None):
+        self.counts = [0] * (len(BUCKETS_US) + 1)
+        self.budget_us = budget_us
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+        self.overruns = 0
+
+    def record(self, us):
+        i = 0
+        while i < len(BUCKETS_US) and us > BUCKETS_US[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total_us += us
+        if us > self.max_us:
+            self.max_us = us
+        if self.budget_us is not None and us > self.budget_us:
+            self.overruns += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of the samples, None past the last bound"""
+        target = fraction * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return BUCKETS_US[i] if i < len(BUCKETS_US) else None
+        return 0
+
+    def reset(self):
+        self.__init__(self.budget_us)
+
+
+class SliceTimer:
+    """
+    Awaits a coroutine one step at a time and times each synchronous slice
+    between its awaits (DNS lookups, JSON parsing, ...), which is what holds
+    up the other tasks; the wall time of a network job is mostly spent
+    waiting. longest_us is the longest slice so far.
+    """
+
+    def __init__(self, coro):
+        self.coro = coro
+        self.longest_us = 0
+
+    def __iter__(self):
+        coro = self.coro
+        value = None
+        error = None
+        while True:
+            start = time.ticks_us()
+            try:
+                try:
+                    awaited = coro.send(value) if error is None else coro.throw(error)
+                finally:
+                    elapsed = time.ticks_diff(time.ticks_us(), start)
+                    if elapsed > self.longest_us:
+                        self.longest_us = elapsed
+            except StopIteration as e:
+                return e.value
+            value = None
+            error = None
+            try:
+                value = yield awaited
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as e:  # e.g. cancellation, passed on to the coroutine
+                error = e
+
+    __await__ = __iter__  # MicroPython awaits __iter__, CPython __await__
+
+
+class Instrumentation:
+    """
+    Durations of every service call and render, one Histogram per name. A
+    record() is two ticks_us() reads and a short bucket scan, cheap enough to
+    stay on in production. dump() prints the table on the serial console,
+    summary() condenses it into log attributes. Async jobs get two entries:
+    their wall time, which has no budget, and as "<name>.block" the longest
+    slice of each run that kept the other tasks waiting.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.since = time.ticks_ms()
+
+    def histogram(self, name, budget_us=TICK_BUDGET_US) -> Histogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = Histogram(budget_us)
+            self.histograms[name] = histogram
+        return histogram
+
+    def record(self, name, us, budget_us=TICK_BUDGET_US):
+        self.histogram(name, budget_us).record(us)
+
+    def dump(self):
+        seconds = time.ticks_diff(time.ticks_ms(), self.since) // 1000
+        print(f"timings over {seconds} s, buckets in us: " + " ".join(f"<={bound}" for bound in BUCKETS_US) + " more")
+        for name, histogram in self.histograms.items():
+            avg = histogram.total_us // histogram.count if histogram.count else 0
+            print(f"{name:<16} n={histogram.count:<6} avg={avg:<7} max={histogram.max_us:<8} "
+                  f"over={histogram.overruns:<4} " + " ".join(str(count) for count in histogram.counts))
+
+    def summary(self) -> dict:
+        """One attribute per name: count, p90 bucket, max and overruns"""
+        attributes = {}
+        for name, histogram in self.histograms.items():
+            p90 = histogram.percentile(0.9)
+            attributes[name] = (f"n={histogram.count} p90<={p90 if p90 is not None else 'inf'}us "
+                                f"max={histogram.max_us}us over={histogram.overruns}")
+        return attributes
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+        self.since = time.ticks_ms()
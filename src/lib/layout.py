@@ -0,0 +1,119 @@
+from lib.font_metrics import FontMetrics
+
+ALIGN_LEFT = 0
+ALIGN_CENTER = 1
+ALIGN_RIGHT = 2
+
+ELLIPSIS = "..."
+
+class TextLayout:
+    """
+    Lays text out into a box: left, center or right alignment, ellipsis
+    truncation of what does not fit, and optionally word-wrapped lines.
+    Laid-out runs are cached by (font, text, box, align, multiline), so a
+    string shown on consecutive frames is measured only once.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.entries = {}  # key -> [runs, last_used]
+        self.clock = 0
+        self.hits = 0
+        self.misses = 0
+
+    def layout(self, font, text, x, y, width, height, align=ALIGN_LEFT, multiline=False) -> list:
+        """Return the runs as a list of (text, x, y) tuples"""
+        self.clock += 1
+        key = (font, text, x, y, width, height, align, multiline)
+        entry = self.entries.get(key)
+        if entry is not None:
+            entry[1] = self.clock
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        if len(self.entries) >= self.max_entries:
+            self._evict()
+        runs = self._layout(font, text, x, y, width, height, align, multiline)
+        self.entries[key] = [runs, self.clock]
+        return runs
+
+    def draw(self, writer, display, text, x, y, width, height, align=ALIGN_LEFT, multiline=False):
+        """Lay text out in the writer's font and print it"""
+        for run, run_x, run_y in self.layout(writer.font, text, x, y, width, height, align, multiline):
+            writer.set_textpos(display, run_y, run_x)
+            writer.cpos = 0
+            writer.printstring(run)
+
+    def clear(self):
+        self.entries = {}
+
+    def _layout(self, font, text, x, y, width, height, align, multiline):
+        metrics = FontMetrics.for_font(font)
+        line_height = font.height()
+        max_lines = max(height // line_height, 1) if multiline else 1
+
+        if multiline:
+            lines = []
+            for paragraph in text.split("\n"):
+                lines.extend(self._wrap(metrics, paragraph, width))
+        else:
+            lines = [text.replace("\n", " ")]
+
+        if len(lines) > max_lines:
+            lines = lines[:max_lines]
+            lines[-1] = self._truncate(metrics, lines[-1] + ELLIPSIS, width)
+
+        runs = []
+        for n, line in enumerate(lines):
+            line = self._truncate(metrics, line, width)
+            if not line:
+                continue
+            line_width = metrics.stringlen(line)
+            if align == ALIGN_RIGHT:
+                run_x = x + width - line_width
+            elif align == ALIGN_CENTER:
+                run_x = x + (width - line_width) // 2
+            else:
+                run_x = x
+            runs.append((line, run_x, y + n * line_height))
+        return runs
+
+    def _wrap(self, metrics, text, width):
+        # greedy word wrap; a word wider than the box is truncated later
+        lines = []
+        line = ""
+        for word in text.split(" "):
+            candidate = word if not line else line + " " + word
+            if line and metrics.stringlen(candidate) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+        return lines
+
+    def _truncate(self, metrics, text, width):
+        if metrics.stringlen(text) <= width:
+            return text
+        available = width - metrics.stringlen(ELLIPSIS)
+        length = 0
+        end = 0
+        for char in text:
+            length += metrics.width(char)
+            if length > available:
+                break
+            end += 1
+        if available < 0:
+            return ""
+        return text[:end].rstrip() + ELLIPSIS
+
+    def _evict(self):
+        oldest_key = None
+        oldest = self.clock
+        for key, entry in self.entries.items():
+            if entry[1] < oldest:
+                oldest = entry[1]
+                oldest_key = key
+        if oldest_key is not None:
+            del self.entries[oldest_key]
@@ -1,5 +1,4 @@
-import urequests
-import ujson
+from lib import http
 from lib.state import ApplicationState
 from lib.error_codes import ErrorCodes
 
@@ -16,19 +15,19 @@ class Location:
         else:
             print(f"Location: {message}")
 
-    def act(self, state: ApplicationState):
+    async def act(self, state: ApplicationState):
         if state.wifiConnected:
             if not self.fetchDone:
-                self._fetch_timezone_data(state)
+                await self._fetch_timezone_data(state)
                 self.fetchDone = True # fetch done
         else:
             self.fetchDone = False # resync when the wifi is back
 
-    def _fetch_timezone_data(self, state: ApplicationState):
+    async def _fetch_timezone_data(self, state: ApplicationState):
         try:
-            response = urequests.get(self.API_URL, timeout=5)
+            response = await http.get(self.API_URL, timeout=5)
             if response.status_code == 200:
-                data = ujson.loads(response.text)
+                data = response.json()
                 if data.get("status") == "success":
                     state.timezoneOffset = data.get("offset", 3600)
                     state.locationCode = data.get("timezone", "Europe/Berlin")
@@ -1,11 +1,7 @@
 import time
 import json
 
-try:
-    import urequests as requests
-except ImportError:
-    import requests
-
+from lib import http
 from lib.settings import Settings
 
 DASH0_ENDPOINT = "https://esp32clock-dash0-relay.gannochenko-dev.workers.dev"
@@ -31,13 +27,9 @@ class Logger:
         self.is_wifi_connected = False
 
     def set_wifi_status(self, connected: bool):
-        """Update wifi connection status"""
+        """Update wifi connection status, the queue is sent by the next flush()"""
         self.is_wifi_connected = connected
 
-        # Try to flush queue when wifi connects
-        if connected and len(self.log_queue) > 0:
-            self._flush_queue()
-
     def debug(self, message: str, **attributes):
         """Log debug message"""
         self._log(self.LEVEL_DEBUG, message, attributes)
@@ -64,19 +56,14 @@ class Logger:
         if attributes:
             print(f"  Attributes: {attributes}")
 
-        # Always send to Dash0
+        # Always send to Dash0, from the flush() task so logging never blocks
         log_entry = {
             "timestamp": timestamp_ns,
             "level": level,
             "message": message,
             "attributes": attributes
         }
-
-        if self.is_wifi_connected:
-            self._send_to_dash0([log_entry])
-        else:
-            # Queue for later if wifi is not connected
-            self._queue_log(log_entry)
+        self._queue_log(log_entry)
 
     def _queue_log(self, log_entry: dict):
         """Add log to queue"""
@@ -86,18 +73,19 @@ class Logger:
         if len(self.log_queue) > self.max_queue_size:
             self.log_queue.pop(0)
 
-    def _flush_queue(self):
-        """Send queued logs to Dash0"""
-        if len(self.log_queue) == 0:
+    async def flush(self):
+        """Send queued logs to Dash0 while wifi is connected"""
+        if not self.is_wifi_connected or len(self.log_queue) == 0:
             return
 
+        log_entries = self.log_queue
+        self.log_queue = []  # entries logged while sending wait for the next flush
         try:
-            self._send_to_dash0(self.log_queue)
-            self.log_queue = []
+            await self._send_to_dash0(log_entries)
         except Exception as e:
             print(f"[Logger] Failed to flush queue: {e}")
 
-    def _send_to_dash0(self, log_entries: list):
+    async def _send_to_dash0(self, log_entries: list):
         """Send logs to Dash0 via relay"""
         try:
             # Build relay-format JSON payload
@@ -121,7 +109,7 @@ class Logger:
 
             print(f"[Logger] Sending to {DASH0_ENDPOINT}")
 
-            response = requests.post(
+            response = await http.post(
                 DASH0_ENDPOINT,
                 data=payload,
                 headers=headers
@@ -1,16 +1,51 @@
-import ntptime
+import machine
+import socket
+import struct
+import time
 from lib.state import ApplicationState
-from lib.util import throttle
+from lib.runtime import sleep_ms
+
+NTP_HOST = "pool.ntp.org"
+NTP_TIMEOUT_MS = 1000
+# seconds between the NTP epoch (1900) and the platform's epoch (2000 on MicroPython ports, 1970 elsewhere)
+NTP_DELTA = 3155673600 if time.gmtime(0)[0] == 2000 else 2208988800
 
 class NTP:
     def __init__(self):
         self.syncDone = False
 
     # needs wifi to sync
-    def act(self, state: ApplicationState):
+    async def act(self, state: ApplicationState):
         if state.wifiConnected:
             if not self.syncDone:
-                ntptime.settime()
+                await self.settime()
                 self.syncDone = True
         else:
             self.syncDone = False # resync when the wifi is back
+
+    async def query(self) -> int:
+        """Ask NTP_HOST for the time, like ntptime.time() but without blocking on the reply"""
+        request = bytearray(48)
+        request[0] = 0x1B  # LI=0, VN=3, Mode=3 (client)
+        addr = socket.getaddrinfo(NTP_HOST, 123)[0][-1]
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            s.setblocking(False)
+            s.sendto(request, addr)
+            start = time.ticks_ms()
+            while True:
+                try:
+                    msg = s.recv(48)
+                    break
+                except OSError:  # nothing received yet
+                    if time.ticks_diff(time.ticks_ms(), start) >= NTP_TIMEOUT_MS:
+                        raise OSError("NTP request timed out")
+                    await sleep_ms(20)
+        finally:
+            s.close()
+        return struct.unpack("!I", msg[40:44])[0] - NTP_DELTA
+
+    async def settime(self):
+        """Set the RTC to UTC from NTP, like ntptime.settime()"""
+        tm = time.gmtime(await self.query())
+        machine.RTC().datetime((tm[0], tm[1], tm[2], tm[6] + 1, tm[3], tm[4], tm[5], 0))
@@ -0,0 +1,71 @@
+import time
+from lib.state import ApplicationState
+
+class RefreshPolicy:
+    """
+    Decides per main loop iteration whether a display is looked at at all.
+    When due() returns False the display manager skips the painter entirely,
+    not even its fingerprint is computed.
+    """
+
+    def due(self, state: ApplicationState, now: int) -> bool:
+        return True
+
+    def reset(self):
+        """Make the next due() return True, e.g. after an invalidate"""
+        pass
+
+class OnStateChange(RefreshPolicy):
+    """Checked every iteration, redrawn when the painter's fingerprint changes"""
+    pass
+
+class OnSecondEdge(RefreshPolicy):
+    """Checked once per second of the clock in the state"""
+
+    def __init__(self):
+        self.last_second = None
+
+    def due(self, state: ApplicationState, now: int) -> bool:
+        if state.second == self.last_second:
+            return False
+        self.last_second = state.second
+        return True
+
+    def reset(self):
+        self.last_second = None
+
+class Every(RefreshPolicy):
+    """Checked at most every `seconds`, changes in between wait for the next check"""
+
+    def __init__(self, seconds):
+        self.interval_ms = int(seconds * 1000)
+        self.last_check = None
+
+    def due(self, state: ApplicationState, now: int) -> bool:
+        if self.last_check is not None and time.ticks_diff(now, self.last_check) < self.interval_ms:
+            return False
+        self.last_check = now
+        return True
+
+    def reset(self):
+        self.last_check = None
+
+class Off(RefreshPolicy):
+    """Never redrawn, the panel keeps what it shows"""
+
+    def due(self, state: ApplicationState, now: int) -> bool:
+        return False
+
+def refresh_policy(spec) -> RefreshPolicy:
+    """Policy from a settings value: "second", "change", "off" or a number of seconds"""
+    if isinstance(spec, RefreshPolicy):
+        return spec
+    if spec == "second":
+        return OnSecondEdge()
+    if spec == "change":
+        return OnStateChange()
+    if spec == "off":
+        return Off()
+    if isinstance(spec, (int, float)) and spec > 0:
+        return Every(spec)
+    raise ValueError(f"unknown refresh policy: {spec}")
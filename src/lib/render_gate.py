@@ -0,0 +1,33 @@
+from lib.state import ApplicationState
+
+class RenderGate:
+    """
+    Skips a painter's whole draw/show pass while the part of the state it
+    reads is unchanged. The painter tells what it reads by implementing
+    fingerprint(state), returning a tuple of exactly those values.
+    """
+
+    def __init__(self, painter):
+        self.painter = painter
+        self.last_fingerprint = None
+        self.draws = 0
+        self.skips = 0
+
+    def invalidate(self):
+        """Force the next draw() through, e.g. after the panel was reset"""
+        self.last_fingerprint = None
+
+    def draw(self, state: ApplicationState) -> bool:
+        fingerprint = self.painter.fingerprint(state)
+        if fingerprint == self.last_fingerprint:
+            self.skips += 1
+            return False
+
+        self.painter.draw(state)
+        self.last_fingerprint = fingerprint
+        self.draws += 1
+        return True
+
+    def skip_ratio(self) -> float:
+        total = self.draws + self.skips
+        return self.skips / total if total else 0.0
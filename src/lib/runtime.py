@@ -0,0 +1,44 @@
+import asyncio
+from lib.scheduler import Job, Scheduler
+
+def sleep_ms(ms):
+    # asyncio.sleep_ms is MicroPython only
+    if hasattr(asyncio, "sleep_ms"):
+        return asyncio.sleep_ms(ms)
+    return asyncio.sleep(ms / 1000)
+
+class Runtime:
+    """
+    Runs the application's jobs on asyncio. Periodic jobs share one
+    Scheduler task, which sleeps until the earliest deadline; jobs added
+    with every_async() are awaited, so a network call in flight yields to
+    the other tasks and the UI keeps its deadlines. Jobs that time
+    themselves (the clock) run as their own task via spawn().
+    """
+
+    def __init__(self, timings=None):
+        self.scheduler = Scheduler(timings)
+        self.tasks = []  # (name, loop) for jobs that schedule themselves
+
+    def every(self, name, interval_ms, act, jitter_ms=0, backoff_max_ms=None) -> Job:
+        """Call act() every interval_ms; it must return quickly"""
+        return self.scheduler.add(Job(name, interval_ms, act, False, jitter_ms, backoff_max_ms))
+
+    def every_async(self, name, interval_ms, act, jitter_ms=0, backoff_max_ms=None) -> Job:
+        """Await act() every interval_ms"""
+        return self.scheduler.add(Job(name, interval_ms, act, True, jitter_ms, backoff_max_ms))
+
+    def spawn(self, name, loop):
+        """Run the coroutine function loop() as a task; it schedules itself"""
+        self.tasks.append((name, loop))
+
+    async def main(self):
+        coroutines = [self.scheduler.run()] + [loop() for name, loop in self.tasks]
+        await asyncio.gather(*coroutines)
+
+    def upcoming(self) -> list:
+        """(job, ms until due) for the periodic jobs, soonest first"""
+        return self.scheduler.upcoming()
+
+    def stats(self) -> list:
+        return self.scheduler.stats()
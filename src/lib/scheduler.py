@@ -0,0 +1,165 @@
+import asyncio
+import random
+import time
+from heapq import heappush, heappop, heapify
+from lib.instrumentation import SliceTimer
+
+# deadlines are kept relative to an epoch, which is moved on long before
+# the difference could overflow the ticks period
+REBASE_MS = 24 * 3600 * 1000
+
+class Job:
+    """
+    A periodic call of act(), with its own timer. jitter_ms spreads the
+    runs by a random 0..jitter_ms delay. With backoff_max_ms set, a run that
+    raises doubles the interval (up to backoff_max_ms) instead of stopping
+    the application, and the first successful run resets it.
+    """
+
+    def __init__(self, name, interval_ms, act, is_async=False, jitter_ms=0, backoff_max_ms=None):
+        self.name = name
+        self.interval_ms = interval_ms
+        self.act = act
+        self.is_async = is_async
+        self.jitter_ms = jitter_ms
+        self.backoff_max_ms = backoff_max_ms
+        self.delay_ms = interval_ms  # interval to the next run, grows while backing off
+        self.deadline = None
+        self.running = False
+        self.runs = 0
+        self.errors = 0
+        self.last_error = None
+        self.late_max_ms = 0  # furthest behind its deadline a run started
+
+    def next_deadline(self, start):
+        delay = self.delay_ms
+        if self.jitter_ms:
+            delay += random.randint(0, self.jitter_ms)
+        return time.ticks_add(start, delay)
+
+
+class Scheduler:
+    """
+    Keeps the next deadline of every job in a min-heap and sleeps until the
+    earliest one, so nothing is called just to find out it has nothing to
+    do. Async jobs run as tasks and are put back on the heap when they
+    finish, so a job never overlaps itself.
+    """
+
+    def __init__(self, timings=None):
+        self.timings = timings  # Instrumentation recording how long each run takes
+        self.jobs = []
+        self.heap = []  # (ms from epoch to deadline, seq, job)
+        self.seq = 0  # breaks ties between equal deadlines
+        self.epoch = time.ticks_ms()
+        self.wake = asyncio.Event()
+        self.failure = None  # error of an async job without backoff, raised by run()
+
+    def add(self, job: Job) -> Job:
+        self.jobs.append(job)
+        self._push(job, time.ticks_ms())
+        return job
+
+    def _push(self, job, deadline):
+        job.deadline = deadline
+        if time.ticks_diff(time.ticks_ms(), self.epoch) > REBASE_MS:
+            # raw ticks wrap around, so they cannot be the heap key
+            self.epoch = time.ticks_ms()
+            self.heap = [(time.ticks_diff(j.deadline, self.epoch), seq, j) for _, seq, j in self.heap]
+            heapify(self.heap)
+        self.seq += 1
+        heappush(self.heap, (time.ticks_diff(deadline, self.epoch), self.seq, job))
+        self.wake.set()
+
+    def _pop_due(self):
+        if not self.heap or time.ticks_diff(self.heap[0][2].deadline, time.ticks_ms()) > 0:
+            return None
+        return heappop(self.heap)[2]
+
+    def _finish(self, job, start, error):
+        job.runs += 1
+        if error is None:
+            job.delay_ms = job.interval_ms
+        elif job.backoff_max_ms is None:
+            raise error
+        else:
+            job.errors += 1
+            job.last_error = error
+            job.delay_ms = min(job.delay_ms * 2, job.backoff_max_ms)
+        deadline = job.next_deadline(start)
+        if time.ticks_diff(deadline, time.ticks_ms()) < 0:
+            deadline = time.ticks_ms()  # overran a whole period, no catching up
+        self._push(job, deadline)
+
+    async def _run_async(self, job, start):
+        error = None
+        t0 = time.ticks_us()
+        run = SliceTimer(job.act())
+        try:
+            await run
+        except Exception as e:
+            error = e
+        if self.timings is not None:
+            # wall time including awaits, which do not hold anything up: no budget
+            self.timings.record(job.name, time.ticks_diff(time.ticks_us(), t0), None)
+            # what did hold the other tasks up is measured against the budget
+            self.timings.record(job.name + ".block", run.longest_us)
+        job.running = False
+        try:
+            self._finish(job, start, error)
+        except Exception as e:
+            self.failure = e  # a task's exception would go unnoticed, run() raises it
+            self.wake.set()
+
+    def _start(self, job):
+        start = time.ticks_ms()
+        late = time.ticks_diff(start, job.deadline)
+        if late > job.late_max_ms:
+            job.late_max_ms = late
+        if job.is_async:
+            job.running = True
+            asyncio.create_task(self._run_async(job, start))
+            return
+        error = None
+        t0 = time.ticks_us()
+        try:
+            job.act()
+        except Exception as e:
+            error = e
+        if self.timings is not None:
+            self.timings.record(job.name, time.ticks_diff(time.ticks_us(), t0))
+        self._finish(job, start, error)
+
+    async def run(self):
+        while True:
+            if self.failure is not None:
+                raise self.failure
+            job = self._pop_due()
+            while job is not None:
+                self._start(job)
+                job = self._pop_due()
+
+            self.wake.clear()
+            if self.failure is not None:
+                continue
+            if not self.heap:
+                await self.wake.wait()
+                continue
+            delay = time.ticks_diff(self.heap[0][2].deadline, time.ticks_ms())
+            if delay > 0:
+                try:
+                    # woken early when a finished async job is put back
+                    await asyncio.wait_for(self.wake.wait(), delay / 1000)
+                except asyncio.TimeoutError:
+                    pass
+
+    def upcoming(self) -> list:
+        """(name, ms until due) of every job, soonest first; running async jobs last, as None"""
+        now = time.ticks_ms()
+        queued = sorted((time.ticks_diff(job.deadline, now), job.name) for _, _, job in self.heap)
+        return [(name, due) for due, name in queued] + [(job.name, None) for job in self.jobs if job.running]
+
+    def stats(self) -> list:
+        return [{"job": job.name, "interval_ms": job.interval_ms, "delay_ms": job.delay_ms, "runs": job.runs,
+                 "errors": job.errors, "max_late_ms": job.late_max_ms}
+                for job in self.jobs]
@@ -0,0 +1,76 @@
+import time
+from lib.runtime import sleep_ms
+
+class SecondTicker:
+    """
+    Wakes up right after each edge of the RTC's second. The edge is found by
+    polling the RTC once per ms around the predicted time; between edges it
+    sleeps until guard_ms before the next prediction, which is the last edge
+    plus one second of ticks_us. record_flush() measures the lag between the
+    edge and the end of the flush it triggered.
+    """
+
+    def __init__(self, read_second, guard_ms=5):
+        self.read_second = read_second  # read_second() -> the RTC's current second
+        self.guard_ms = guard_ms
+        self.second = None
+        self.edge = None  # ticks_us of the last edge
+        self.resync = True
+        self.edges = 0
+        self.misses = 0  # edges that had already passed when we looked
+        self.lag_last_us = 0
+        self.lag_max_us = 0
+        self.lag_total_us = 0
+        self.lag_count = 0
+
+    async def wait_edge(self) -> int:
+        """Sleep until the next second edge, returns its ticks_us"""
+        if self.second is None:
+            self.second = self.read_second()
+        if not self.resync:
+            delay = time.ticks_diff(time.ticks_add(self.edge, 1_000_000), time.ticks_us()) // 1000 - self.guard_ms
+            if delay > 0:
+                await sleep_ms(delay)
+
+        polled = False
+        while True:
+            second = self.read_second()
+            if second != self.second:
+                break
+            polled = True
+            await sleep_ms(1)
+        now = time.ticks_us()
+        self.second = second
+        self.edges += 1
+
+        if polled or self.edge is None:
+            # seen flipping, within the poll interval
+            self.edge = now
+            self.resync = False
+        else:
+            # the edge passed before we looked: we woke late or the RTC
+            # was set; assume the prediction, and poll from now on until
+            # an edge is seen again
+            self.misses += 1
+            predicted = time.ticks_add(self.edge, 1_000_000)
+            self.edge = predicted if 0 <= time.ticks_diff(now, predicted) < 1_000_000 else now
+            self.resync = True
+        return self.edge
+
+    def record_flush(self):
+        """Call when the frame rendered for the last edge is on the panel"""
+        lag = time.ticks_diff(time.ticks_us(), self.edge)
+        self.lag_last_us = lag
+        if lag > self.lag_max_us:
+            self.lag_max_us = lag
+        self.lag_total_us += lag
+        self.lag_count += 1
+
+    def stats(self) -> dict:
+        return {
+            "edges": self.edges,
+            "misses": self.misses,
+            "lag_last_us": self.lag_last_us,
+            "lag_max_us": self.lag_max_us,
+            "lag_avg_us": self.lag_total_us // self.lag_count if self.lag_count else 0,
+        }
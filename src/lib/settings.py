@@ -6,3 +6,21 @@ class Settings:
         self.password = WIFI_PASSWORD
         self.dash0_auth_token = DASH0_AUTH_TOKEN
         self.weather_api_key = WEATHER_API_KEY
+
+        # display bus clocks in Hz, util/busprobe.py measures what the wiring sustains
+        self.time_display_freq = 400_000
+        self.stat_display_freq = 400_000
+
+        # "i2c" or "spi" per display; SPI panels are wired to the pins below
+        self.time_display_bus = "i2c"
+        self.stat_display_bus = "i2c"
+        self.spi_freq = 10_000_000
+        self.spi_pins = {"sck": 7, "mosi": 9}
+        self.time_display_spi_pins = (5, 6, 10)  # DC, RES, CS
+        self.stat_display_spi_pins = (13, 14, 15)  # DC, RES, CS
+
+        # when each display is redrawn: "second", "change", "off" or every N seconds
+        self.time_display_refresh = "second"
+        self.stat_display_refresh = 5
+        # the stat display rotates its pages every this many seconds
+        self.stat_display_page_seconds = 10
@@ -2,6 +2,12 @@
 
 from micropython import const
 import framebuf
+import time
+
+try:
+    import _thread
+except ImportError:
+    _thread = None
 
 
 # register definitions
@@ -23,6 +29,23 @@ SET_DISP_CLK_DIV = const(0xD5)
 SET_PRECHARGE = const(0xD9)
 SET_VCOM_DESEL = const(0xDB)
 SET_CHARGE_PUMP = const(0x8D)
+SET_SCROLL_RIGHT = const(0x26)
+SET_SCROLL_LEFT = const(0x27)
+SET_SCROLL_OFF = const(0x2E)
+SET_SCROLL_ON = const(0x2F)
+
+# Frames per one-column scroll step, indexed by the scroll interval code
+SCROLL_FRAMES = (5, 64, 128, 256, 3, 4, 25, 2)
+
+# Typical oscillator frequency at SET_DISP_CLK_DIV's default frequency
+# setting (0x8_), per the datasheet; individual panels deviate by some %
+OSC_FREQ = const(370_000)
+
+# Cost in bus bytes of opening an extra address window (one command
+# transaction with 6 command bytes, plus the framing of its data
+# transaction), used to decide whether neighbouring dirty pages are cheaper
+# to send as one merged window.
+WINDOW_OVERHEAD = const(11)
 
 
 # Subclassing FrameBuffer provides support for graphics primitives
@@ -34,11 +57,33 @@ class SSD1306(framebuf.FrameBuffer):
         self.external_vcc = external_vcc
         self.pages = self.height // 8
         self.buffer = bytearray(self.pages * self.width)
+        # Copy of what the panel's GDDRAM currently holds. Only the windows
+        # where the buffer differs from it are sent on show().
+        self.shadow = bytearray(self.pages * self.width)
+        self.shadow_valid = False
+        self.bytes_sent = 0  # payload bytes sent by the last show()
+        self.bytes_saved = 0  # payload bytes skipped by the last show()
+        self.windows_sent = 0  # address windows opened by the last show()
+        # Last value written to each register, so repeated writes of the same
+        # value (e.g. contrast on every frame) are not sent again.
+        self.registers = {}
+        self.window_cmds = bytearray(6)
+        self.transactions = 0  # bus transactions since power up
+        self.frame_transactions = 0  # bus transactions between the last two show() calls
+        self.frame_mark = 0
+        # Hardware scroll: the command burst that starts the wanted scroll
+        # (None for no scroll), the one running on the panel, and pages
+        # whose GDDRAM no longer matches the shadow because they scrolled
+        self.scroll = None
+        self.scroll_active = None
+        self.scroll_restart = False  # set_scroll() was called since the scroll started
+        self.scroll_started = 0  # ticks_us when the running scroll was started
+        self.stale_pages = 0
         super().__init__(self.buffer, self.width, self.height, framebuf.MONO_VLSB)
         self.init_display()
 
     def init_display(self):
-        for cmd in (
+        self.write_cmds(bytes((
             SET_DISP,  # display off
             # address setting
             SET_MEM_ADDR,
@@ -71,66 +116,326 @@ class SSD1306(framebuf.FrameBuffer):
             SET_CHARGE_PUMP,
             0x10 if self.external_vcc else 0x14,
             SET_DISP | 0x01,  # display on
-        ):  # on
-            self.write_cmd(cmd)
+        )))
+        self.registers = {SET_DISP: 1, SET_CONTRAST: 0xFF, SET_NORM_INV: 0, SET_COM_OUT_DIR: 1,
+                          SET_MUX_RATIO: self.height - 1, SET_DISP_CLK_DIV: 0x80,
+                          SET_PRECHARGE: 0x22 if self.external_vcc else 0xF1}
+        self.invalidate()
         self.fill(0)
         self.show()
 
+    def write_cmds(self, cmds):
+        # drivers that can batch commands into one transaction override this
+        for cmd in cmds:
+            self.write_cmd(cmd)
+
+    def write_datav(self, bufs):
+        # drivers that can send several buffers in one transaction override this
+        for buf in bufs:
+            self.write_data(buf)
+
+    def update_register(self, register, value):
+        """Record value in the register shadow, returns False if the panel already holds it"""
+        if self.registers.get(register) == value:
+            return False
+        self.registers[register] = value
+        return True
+
+    def wait(self):
+        # drivers flushing in the background block here until the bus is free
+        pass
+
     def poweroff(self):
-        self.write_cmd(SET_DISP)
+        if self.update_register(SET_DISP, 0):
+            self.wait()
+            self.write_cmd(SET_DISP)
 
     def poweron(self):
-        self.write_cmd(SET_DISP | 0x01)
+        if self.update_register(SET_DISP, 1):
+            self.wait()
+            self.write_cmd(SET_DISP | 0x01)
 
     def contrast(self, contrast):
-        self.write_cmd(SET_CONTRAST)
-        self.write_cmd(contrast)
+        if self.update_register(SET_CONTRAST, contrast):
+            self.wait()
+            self.write_cmds(bytes((SET_CONTRAST, contrast)))
 
     def invert(self, invert):
-        self.write_cmd(SET_NORM_INV | (invert & 1))
+        if self.update_register(SET_NORM_INV, invert & 1):
+            self.wait()
+            self.write_cmd(SET_NORM_INV | (invert & 1))
 
     def rotate(self, rotate):
-        self.write_cmd(SET_COM_OUT_DIR | ((rotate & 1) << 3))
-        self.write_cmd(SET_SEG_REMAP | (rotate & 1))
+        if self.update_register(SET_COM_OUT_DIR, rotate & 1):
+            self.wait()
+            self.write_cmds(bytes((SET_COM_OUT_DIR | ((rotate & 1) << 3), SET_SEG_REMAP | (rotate & 1))))
+
+    def set_scroll(self, page0, page1, interval=0, left=True):
+        """
+        Scroll pages page0..page1 horizontally in hardware, wrapping around
+        the 128 columns. The next show() (re)starts the scroll from the
+        band's content in the buffer. While it runs, show() leaves the band
+        alone and only sends what changed elsewhere; write_window() can
+        feed new columns into it.
+        """
+        self.wait()
+        self.scroll = bytes((SET_SCROLL_LEFT if left else SET_SCROLL_RIGHT, 0x00, page0, interval, page1,
+                             0x00, 0xFF, SET_SCROLL_ON))
+        self.scroll_restart = True
+
+    def clear_scroll(self):
+        """Stop scrolling with the next show(), which also rewrites the scrolled band"""
+        self.wait()
+        self.scroll = None
+        self.scroll_restart = False
+
+    def frame_us(self) -> int:
+        """Nominal frame period, from the clock divider, precharge and multiplex ratio sent to the panel"""
+        divide = (self.registers[SET_DISP_CLK_DIV] & 0x0F) + 1
+        precharge = self.registers[SET_PRECHARGE]
+        # DCLKs per row: phase 1 and phase 2 of the precharge, plus 50 for the segment pulse
+        row_clocks = (precharge & 0x0F) + (precharge >> 4) + 50
+        return divide * row_clocks * (self.registers[SET_MUX_RATIO] + 1) * 1_000_000 // OSC_FREQ
+
+    def scroll_step_us(self) -> int:
+        """How long the running (or wanted) scroll takes to move one column"""
+        scroll = self.scroll_active or self.scroll
+        return SCROLL_FRAMES[scroll[3]] * self.frame_us()
+
+    def scroll_clock(self):
+        """ticks_us when the running scroll started, None until the next show() (re)starts it"""
+        if self.scroll_active is None or self.scroll_restart:
+            return None
+        return self.scroll_started
+
+    def write_window(self, page0, page1, col0, col1, rows):
+        """
+        Write rows (one buffer per page) straight into a window of the panel,
+        bypassing the shadow, e.g. to feed columns into a scrolling band
+        """
+        self.wait()
+        self.write_address(page0, page1, col0, col1)
+        self.write_datav(rows)
+
+    def write_address(self, page0, page1, col0, col1):
+        col_offset = (128 - self.width) // 2  # narrow displays use centred columns
+        cmds = self.window_cmds
+        cmds[0] = SET_COL_ADDR
+        cmds[1] = col0 + col_offset
+        cmds[2] = col1 + col_offset
+        cmds[3] = SET_PAGE_ADDR
+        cmds[4] = page0
+        cmds[5] = page1
+        self.write_cmds(cmds)
+
+    def invalidate(self):
+        """Forget the shadow copy, so the next show() sends the full frame"""
+        self.shadow_valid = False
 
     def show(self):
-        x0 = 0
-        x1 = self.width - 1
-        if self.width != 128:
-            # narrow displays use centred columns
-            col_offset = (128 - self.width) // 2
-            x0 += col_offset
-            x1 += col_offset
-        self.write_cmd(SET_COL_ADDR)
-        self.write_cmd(x0)
-        self.write_cmd(x1)
-        self.write_cmd(SET_PAGE_ADDR)
-        self.write_cmd(0)
-        self.write_cmd(self.pages - 1)
-        self.write_data(self.buffer)
+        self.flush(self.buffer)
+
+    def flush(self, frame):
+        """Send the parts of frame that differ from the panel"""
+        running = self.scroll_active
+        scrolling = 0  # pages of a running scroll, left to the panel
+        if running is not None:
+            if self.scroll_restart or running != self.scroll:
+                self.write_cmd(SET_SCROLL_OFF)
+                self.scroll_active = None
+                # the band moved on the panel, rewrite it from the frame
+                for page in range(running[2], running[4] + 1):
+                    self.stale_pages |= 1 << page
+            else:
+                for page in range(running[2], running[4] + 1):
+                    scrolling |= 1 << page
+        windows = self.dirty_windows(frame, scrolling)
+        buf = memoryview(frame)
+        shadow = memoryview(self.shadow)
+        width = self.width
+        sent = 0
+        for page0, page1, col0, col1 in windows:
+            self.write_address(page0, page1, col0, col1)
+            if col0 == 0 and col1 == width - 1:
+                # full-width windows are contiguous in the buffer
+                start = page0 * width
+                end = (page1 + 1) * width
+                self.write_data(buf[start:end])
+                shadow[start:end] = buf[start:end]
+                sent += end - start
+            else:
+                # rows of a narrow window are not contiguous in the buffer;
+                # the panel wraps to col0 of the next page after col1, so
+                # they are streamed one after another
+                rows = []
+                for page in range(page0, page1 + 1):
+                    start = page * width + col0
+                    end = page * width + col1 + 1
+                    rows.append(buf[start:end])
+                    shadow[start:end] = buf[start:end]
+                    sent += end - start
+                self.write_datav(rows)
+        self.shadow_valid = True
+        self.stale_pages = 0
+        if self.scroll is not None and self.scroll_active is None:
+            self.write_cmds(self.scroll)
+            self.scroll_active = self.scroll
+            self.scroll_started = time.ticks_us()
+            self.scroll_restart = False
+        self.frame_transactions = self.transactions - self.frame_mark
+        self.frame_mark = self.transactions
+        self.bytes_sent = sent
+        self.bytes_saved = len(self.buffer) - sent
+        self.windows_sent = len(windows)
+
+    def dirty_windows(self, frame=None, skip_pages=0):
+        """Return the (page0, page1, col0, col1) windows of frame that differ from the panel"""
+        width = self.width
+        if not self.shadow_valid and not skip_pages:
+            return [(0, self.pages - 1, 0, width - 1)]
+
+        buf = self.buffer if frame is None else frame
+        shadow = self.shadow
+        windows = []
+        for page in range(self.pages):
+            start = page * width
+            end = start + width
+            if skip_pages & (1 << page):
+                continue
+            if self.stale_pages & (1 << page) or not self.shadow_valid:
+                col0 = 0
+                col1 = width - 1
+            elif buf[start:end] == shadow[start:end]:
+                continue
+            else:
+                col0 = 0
+                while buf[start + col0] == shadow[start + col0]:
+                    col0 += 1
+                col1 = width - 1
+                while buf[start + col1] == shadow[start + col1]:
+                    col1 -= 1
+
+            if windows:
+                page0, prev_page1, prev_col0, prev_col1 = windows[-1]
+                if prev_page1 == page - 1:
+                    # merge with the window above if one bigger window costs
+                    # less than the extra command overhead
+                    merged_col0 = min(col0, prev_col0)
+                    merged_col1 = max(col1, prev_col1)
+                    separate = (prev_page1 - page0 + 1) * (prev_col1 - prev_col0 + 1) + (col1 - col0 + 1) + WINDOW_OVERHEAD
+                    merged = (page - page0 + 1) * (merged_col1 - merged_col0 + 1)
+                    if merged <= separate:
+                        windows[-1] = (page0, page, merged_col0, merged_col1)
+                        continue
+            windows.append((page, page, col0, col1))
+        return windows
 
 
 class SSD1306_I2C(SSD1306):
-    def __init__(self, width, height, i2c, addr=0x3C, external_vcc=False):
+    """
+    With double_buffer=True, show() copies the frame into a front buffer and
+    returns immediately; a _thread flusher sends it while painters draw the
+    next frame into the back buffer. show() waits for the previous transfer
+    before touching the front buffer, so a frame is never torn.
+    """
+
+    def __init__(self, width, height, i2c, addr=0x3C, external_vcc=False, double_buffer=False):
         self.i2c = i2c
         self.addr = addr
         self.temp = bytearray(2)
         self.write_list = [b"\x40", None]  # Co=0, D/C#=1
+        self.cmd_list = [b"\x00", None]  # Co=0, D/C#=0: a stream of commands
+        self.front = None
         super().__init__(width, height, external_vcc)
+        if double_buffer:
+            self.start_flusher()
+
+    def start_flusher(self):
+        if _thread is None:
+            raise OSError("double buffering needs _thread")
+        # the frame buffer keeps its content between frames (painters only
+        # redraw what changed), so the back buffer is copied rather than swapped
+        self.front = bytearray(len(self.buffer))
+        self.flush_error = None
+        self.running = True
+        self.frame_ready = _thread.allocate_lock()
+        self.frame_ready.acquire()
+        self.idle = _thread.allocate_lock()  # held while a frame is pending or in flight
+        _thread.start_new_thread(self._flush_loop, ())
+
+    def stop_flusher(self):
+        if self.front is None:
+            return
+        self.idle.acquire()
+        self.running = False
+        self.frame_ready.release()  # wake the flusher up so it can exit
+        self.idle.acquire()
+        self.idle.release()
+        self.front = None
+
+    def _flush_loop(self):
+        while True:
+            self.frame_ready.acquire()
+            if not self.running:
+                self.idle.release()
+                return
+            try:
+                self.flush(self.front)
+            except Exception as e:
+                self.flush_error = e
+            self.idle.release()
+
+    def wait(self):
+        """Block until the frame handed to the flusher has been sent"""
+        if self.front is not None:
+            self.idle.acquire()
+            self.idle.release()
+
+    def show(self):
+        if self.front is None:
+            self.flush(self.buffer)
+            return
+        self.idle.acquire()  # the previous frame is out
+        if self.flush_error is not None:
+            error = self.flush_error
+            self.flush_error = None
+            self.idle.release()
+            raise error
+        self.front[:] = self.buffer
+        self.frame_ready.release()
 
     def write_cmd(self, cmd):
         self.temp[0] = 0x80  # Co=1, D/C#=0
         self.temp[1] = cmd
         self.i2c.writeto(self.addr, self.temp)
+        self.transactions += 1
+
+    def write_cmds(self, cmds):
+        self.cmd_list[1] = cmds
+        self.i2c.writevto(self.addr, self.cmd_list)
+        self.transactions += 1
 
     def write_data(self, buf):
         self.write_list[1] = buf
         self.i2c.writevto(self.addr, self.write_list)
+        self.transactions += 1
+
+    def write_datav(self, bufs):
+        self.i2c.writevto(self.addr, [b"\x40"] + bufs)
+        self.transactions += 1
 
 
 class SSD1306_SPI(SSD1306):
-    def __init__(self, width, height, spi, dc, res, cs, external_vcc=False):
-        self.rate = 10 * 1024 * 1024
+    """
+    The bus is configured once and every transfer reuses preallocated
+    buffers; command sequences go out as one burst under a single CS
+    assertion. Pass shared_bus=True when other devices on the same SPI bus
+    use different settings, so the bus is configured before every transfer.
+    """
+
+    def __init__(self, width, height, spi, dc, res, cs, external_vcc=False, baudrate=10_000_000, shared_bus=False):
+        self.rate = baudrate
+        self.shared_bus = shared_bus
         dc.init(dc.OUT, value=0)
         res.init(res.OUT, value=0)
         cs.init(cs.OUT, value=1)
@@ -138,7 +443,8 @@ class SSD1306_SPI(SSD1306):
         self.dc = dc
         self.res = res
         self.cs = cs
-        import time
+        self.cmd = bytearray(1)
+        self.spi.init(baudrate=self.rate, polarity=0, phase=0)
 
         self.res(1)
         time.sleep_ms(1)
@@ -147,18 +453,32 @@ class SSD1306_SPI(SSD1306):
         self.res(1)
         super().__init__(width, height, external_vcc)
 
-    def write_cmd(self, cmd):
-        self.spi.init(baudrate=self.rate, polarity=0, phase=0)
-        self.cs(1)
-        self.dc(0)
+    def begin(self, dc):
+        if self.shared_bus:
+            self.spi.init(baudrate=self.rate, polarity=0, phase=0)
+        self.dc(dc)
         self.cs(0)
-        self.spi.write(bytearray([cmd]))
+
+    def end(self):
         self.cs(1)
+        self.transactions += 1
+
+    def write_cmd(self, cmd):
+        self.cmd[0] = cmd
+        self.write_cmds(self.cmd)
+
+    def write_cmds(self, cmds):
+        self.begin(0)
+        self.spi.write(cmds)
+        self.end()
 
     def write_data(self, buf):
-        self.spi.init(baudrate=self.rate, polarity=0, phase=0)
-        self.cs(1)
-        self.dc(1)
-        self.cs(0)
+        self.begin(1)
         self.spi.write(buf)
-        self.cs(1)
+        self.end()
+
+    def write_datav(self, bufs):
+        self.begin(1)
+        for buf in bufs:
+            self.spi.write(buf)
+        self.end()
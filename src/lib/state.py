@@ -6,6 +6,7 @@ class ApplicationState:
 
         # other states
         self.eventCount: int = 0
+        self.eventTitles: list = []
         self.messageCount: int = 0
         self.location: str = "Spandau" # this is temporary
         self.locationCode: str = "Europe/Berlin"
@@ -1,13 +1,42 @@
+import framebuf
 from lib.writer import Writer
-import lib.font6 as font6
-import lib.freesans20 as sans20
-from lib.constants import DISPLAY_CONTRAST, EMAIL_ICON, CALENDAR_ICON, LOCATION_ICON, RAIN_ICON, SNOW_ICON, SUN_ICON, WIFI_ERROR_ICON, WIFI_ICON
+from lib.glyph_cache import GlyphCache
+from lib.digit_cache import DigitSpriteCache
+from lib.font_atlas import FontAtlas, font_path
+from lib.constants import DISPLAY_CONTRAST, EMAIL_ICON, CALENDAR_ICON, LOCATION_ICON, RAIN_ICON, SNOW_ICON, SUN_ICON, TEMP_ICON, WIFI_ERROR_ICON, WIFI_ICON
 from lib.state import ApplicationState
+from lib.widgets import Widget, Screen, ScreenPainter, Layer
+from lib.layout import TextLayout, ALIGN_LEFT
+from lib.font_metrics import FontMetrics
 import random
+import time
 from lib.error_codes import ErrorCodes
 
+# fonts are read from flash on demand; the big one is only opened once the
+# error screen needs it
+font6 = FontAtlas(font_path("font6.fnt"), cache_size=16)
+sans20 = FontAtlas(font_path("freesans20.fnt"), cache_size=8)
+
+def make_icon_sprite(icon_data, width=16, height=16):
+    """Wrap icon data as a FrameBuffer; rows are 2 bytes, LSB is the leftmost pixel (MONO_HMSB)"""
+    return framebuf.FrameBuffer(icon_data, width, height, framebuf.MONO_HMSB)
+
+# icons are wrapped once at import, keyed by the identity of their data
+ICON_SPRITES = {}
+for _icon in (TEMP_ICON, LOCATION_ICON, WIFI_ICON, WIFI_ERROR_ICON, EMAIL_ICON, CALENDAR_ICON, SUN_ICON, RAIN_ICON, SNOW_ICON):
+    ICON_SPRITES[id(_icon)] = make_icon_sprite(_icon)
+del _icon
+
+def draw_icon(display, icon_data, x, y, width=16, height=16):
+    """Draw icon with a single blit, unset pixels are transparent"""
+    sprite = ICON_SPRITES.get(id(icon_data))
+    if sprite is None:
+        sprite = make_icon_sprite(icon_data, width, height)
+        ICON_SPRITES[id(icon_data)] = sprite
+    display.blit(sprite, x, y, 0)
+
 def draw_icon_pixel_by_pixel(display, icon_data, x, y, width=16, height=16):
-    """Draw icon pixel-by-pixel from MONO_HLSB format data"""
+    """Draw icon pixel-by-pixel, reference implementation for draw_icon"""
     for row in range(height):
         byte1 = icon_data[row * 2]
         byte2 = icon_data[row * 2 + 1]
@@ -64,104 +93,359 @@ def draw_glyph(display, glyph, x, y, width=12, height=20, thickness=3):
         for seg in segments[glyph]:
             display.fill_rect(seg[0], seg[1], seg[2], seg[3], 1)
 
-def draw_number(display, number, x, y, digit_width=12, digit_height=20, spacing=2):
+DIGIT_SPRITES = DigitSpriteCache(draw_glyph)
+
+def draw_number(display, number, x, y, digit_width=12, digit_height=20, spacing=2, thickness=3):
+    current_x = x
+    for char in str(number):
+        sprite = DIGIT_SPRITES.get(char, digit_width, digit_height, thickness)
+        if sprite is not None:
+            display.blit(sprite, current_x, y, 0)
+        current_x += digit_width + spacing
+
+def draw_number_segment_by_segment(display, number, x, y, digit_width=12, digit_height=20, spacing=2, thickness=3):
+    """Reference implementation for draw_number"""
     current_x = x
     for char in str(number):
-        draw_glyph(display, char, current_x, y, digit_width, digit_height)
+        draw_glyph(display, char, current_x, y, digit_width, digit_height, thickness)
         current_x += digit_width + spacing
 
+TEXT_LAYOUT = TextLayout()
+
+# long-lived writers: font -> {display: Writer}
+WRITERS = {}
+
+def get_writer(display, font):
+    writers = WRITERS.get(font)
+    if writers is None:
+        writers = {}
+        WRITERS[font] = writers
+    writer = writers.get(display)
+    if writer is None:
+        writer = Writer(display, font, verbose=False, glyph_cache=GlyphCache.for_font(font))
+        # scrolling the device on overflow would corrupt retained widgets
+        writer.set_clip(row_clip=True)
+        writers[display] = writer
+    return writer
+
 def draw_text(display, text, x, y):
-    writer = Writer(display, font6, verbose=False)
+    writer = get_writer(display, font6)
     writer.set_textpos(display, x, y)
+    writer.cpos = 0  # tab position, as for a fresh writer
     writer.printstring(text)
 
 def draw_text_big(display, text, x, y):
-    writer = Writer(display, sans20, verbose=False)
+    writer = get_writer(display, sans20)
     writer.set_textpos(display, x, y)
+    writer.cpos = 0
     writer.printstring(text)
 
 def draw_icon_text(display, text, icon, x, y):
-    draw_icon_pixel_by_pixel(display, icon, y, x)
+    draw_icon(display, icon, y, x)
     draw_text(display, text, x + 1, y + 20)
 
-class Time_Display_Painter:
-    def __init__(self, display):
+class TextWidget(Widget):
+    """
+    Text laid out inside the box: aligned, truncated with an ellipsis when it
+    does not fit, word-wrapped if multiline. indent(state) can shift it right.
+    """
+
+    def __init__(self, x, y, width, height, text, font=font6, fields=(), derive=None, indent=None,
+                 align=ALIGN_LEFT, multiline=False):
+        super().__init__(x, y, width, height, fields, derive)
+        self.text = text  # text(state) -> str
+        self.font = font
+        self.indent = indent
+        self.align = align
+        self.multiline = multiline
+
+    def render(self, display, state: ApplicationState):
+        indent = 0 if self.indent is None else self.indent(state)
+        TEXT_LAYOUT.draw(get_writer(display, self.font), display, self.text(state),
+                         self.x + indent, self.y, self.width - indent, self.height, self.align, self.multiline)
+
+class NumberWidget(Widget):
+    """Seven-segment number, the box fits max_chars glyphs"""
+
+    def __init__(self, x, y, max_chars, text, digit_width=12, digit_height=20, spacing=2, fields=(), derive=None):
+        width = max_chars * digit_width + (max_chars - 1) * spacing
+        super().__init__(x, y, width, digit_height, fields, derive)
+        self.text = text  # text(state) -> str
+        self.digit_width = digit_width
+        self.digit_height = digit_height
+        self.spacing = spacing
+
+    def render(self, display, state: ApplicationState):
+        draw_number(display, self.text(state), self.x, self.y, self.digit_width, self.digit_height, self.spacing)
+
+class IconWidget(Widget):
+    """16x16 icon; icon(state) returns the icon data, or None to show nothing"""
+
+    def __init__(self, x, y, icon, fields=(), derive=None):
+        super().__init__(x, y, 16, 16, fields, derive)
+        self.icon = icon
+
+    def render(self, display, state: ApplicationState):
+        icon = self.icon(state)
+        if icon is not None:
+            draw_icon(display, icon, self.x, self.y)
+
+class IconTextWidget(Widget):
+    """Icon followed by a line of text, as draw_icon_text lays it out"""
+
+    def __init__(self, x, y, width, icon, text, fields=(), derive=None):
+        super().__init__(x, y, width, 16, fields, derive)
+        self.icon = icon
+        self.text = text  # text(state) -> str
+
+    def render(self, display, state: ApplicationState):
+        draw_icon_text(display, self.text(state), self.icon, self.y, self.x)
+
+# widest strip a ticker segment is rendered into; longer ones end in an ellipsis
+TICKER_STRIP_WIDTH = 512
+TICKER_GAP = 24  # blank columns after each segment
+
+class TickerWidget(Widget):
+    """
+    Full-width marquee in pages page0..page1, scrolled left by the panel
+    itself. Each segment (e.g. an event title) is rendered at full length
+    into an off-screen strip and the band starts with its first 128
+    columns; as the panel moves the band, animate() writes the columns that
+    follow into the right edge, counting steps on the panel's scroll clock
+    (see SSD1306.scroll_step_us). The next segment follows the gap, and once
+    a segment has scrolled past, the band is rewritten and the scroll
+    restarted, which also catches up with an oscillator running off its
+    nominal rate. segments(state) returns the list of strings to cycle
+    through.
+    """
+
+    def __init__(self, page0, page1, segments, font=font6, interval=0):
+        super().__init__(0, page0 * 8, 128, (page1 - page0 + 1) * 8)
+        self.page0 = page0
+        self.page1 = page1
+        self.segments = segments
+        self.font = font
+        self.interval = interval
+        # strips of the current and the next segment, each drawn once
+        self.strip = Layer(TICKER_STRIP_WIDTH, self.height)
+        self.next_strip = Layer(TICKER_STRIP_WIDTH, self.height)
+        self.strip_width = 0  # columns of the current segment, gap included
+        self.next_width = 0
+        self.rows = [bytearray(128) for _ in range(page1 - page0 + 1)]  # columns fed in one write
+        self.display = None
+        self.shown = ()
+        self.index = 0
+        self.started = None  # scroll_clock() of the scroll being fed
+        self.fed = 0  # scroll steps whose new column has been written
+
+    def read_inputs(self, state: ApplicationState) -> tuple:
+        return tuple(self.segments(state))
+
+    def draw_strip(self, strip, text) -> int:
+        """Render text into strip, returns the columns the segment takes"""
+        strip.fill(0)
+        TEXT_LAYOUT.draw(get_writer(strip, self.font), strip, text, 0, 0, TICKER_STRIP_WIDTH - TICKER_GAP, self.height)
+        width = FontMetrics.for_font(self.font).stringlen(text) + TICKER_GAP
+        return min(max(width, 128), TICKER_STRIP_WIDTH)
+
+    def render(self, display, state: ApplicationState):
+        segments = self.read_inputs(state)
+        if segments != self.shown:
+            self.shown = segments
+            self.index = 0  # a new list starts over with its first segment
         self.display = display
+        if not segments:
+            if hasattr(display, "clear_scroll"):
+                display.clear_scroll()
+            return
+        self.strip_width = self.draw_strip(self.strip, segments[self.index])
+        self.next_width = self.draw_strip(self.next_strip, segments[(self.index + 1) % len(segments)])
+        self.start(display)
 
-    def draw(self, state: ApplicationState):
-        self.display.fill(0)
-        self.display.contrast(DISPLAY_CONTRAST)
+    def start(self, display):
+        display.blit(self.strip, self.x, self.y)  # the strip's first 128 columns
+        self.fed = 0
+        # an off-screen layer cannot scroll, it keeps the start of the segment
+        if hasattr(display, "set_scroll"):
+            display.set_scroll(self.page0, self.page1, self.interval)
 
-        if state.errorCode > 0:
-            draw_text_big(self.display, "ERROR", 25, 30)
-        else:
-            second_even = state.second % 2 == 0
-            render_wifi = state.wifiConnected or state.wifiError
+    def column(self, position, page) -> int:
+        """Byte of the given column of the current strip, continuing into the next one"""
+        if position < self.strip_width:
+            return self.strip.buffer[page * TICKER_STRIP_WIDTH + position]
+        return self.next_strip.buffer[page * TICKER_STRIP_WIDTH + position - self.strip_width]
+
+    def animate(self, display):
+        if display is not self.display or not self.shown or not hasattr(display, "set_scroll"):
+            return None
+        if len(self.shown) == 1 and self.strip_width == 128:
+            return None  # the panel's rotation alone shows it all
+        step_us = display.scroll_step_us()
+        started = display.scroll_clock()
+        if started is None:
+            return step_us // 1000  # waiting for the flush that starts the scroll
+        if started != self.started:
+            # (re)started from the band in the buffer, e.g. when a carousel shows the page again
+            self.started = started
+            self.fed = 0
+        elapsed = time.ticks_diff(time.ticks_us(), started)
+        steps = elapsed // step_us
 
-            date_offset = 0 if render_wifi else 10
-            
+        if steps >= self.strip_width:
+            # the segment has scrolled past: restart the band with the next one
+            self.index = (self.index + 1) % len(self.shown)
+            self.strip, self.next_strip = self.next_strip, self.strip
+            self.strip_width = self.next_width
+            self.next_width = self.draw_strip(self.next_strip, self.shown[(self.index + 1) % len(self.shown)])
+            self.start(display)
+            display.show()
+            return step_us // 1000
+
+        if steps > self.fed:
+            # after step k the column at the right edge shows strip column
+            # 127 + k; the ones of earlier steps have moved left since
+            count = min(steps - self.fed, 128)
+            first = 128 + steps - count
+            for page, row in enumerate(self.rows):
+                for n in range(count):
+                    row[n] = self.column(first + n, page)
+            display.write_window(self.page0, self.page1, 128 - count, 127,
+                                 [memoryview(row)[:count] for row in self.rows])
+            self.fed = steps
+        return max((steps + 1) * step_us - elapsed, 1000) // 1000
+
+class Time_Display_Painter(ScreenPainter):
+    def __init__(self, display):
+        super().__init__(display, DISPLAY_CONTRAST)
+        self.main_screen = Screen(display, [
             # Show colon on even seconds, hide on odd seconds (like real digital clocks)
-            separator = ":" if second_even else " "
-            draw_number(self.display, f"{state.hour:02d}{separator}{state.minute:02d}", 12, 10, digit_width=18, digit_height=30, spacing=4)
-            draw_text(self.display, f"{state.day:02d} {self.get_month_name(state.month)} {state.year}", 50, 14 + date_offset)
-            if state.wifiConnected:
-                if second_even:
-                    draw_icon_pixel_by_pixel(self.display, WIFI_ICON, 100, 46)
-            elif state.wifiError:
-                draw_icon_pixel_by_pixel(self.display, WIFI_ERROR_ICON, 100, 46)
+            NumberWidget(12, 10, 5, self.get_clock_text, digit_width=18, digit_height=30, spacing=4,
+                         derive=lambda state: (state.hour, state.minute, state.second % 2)),
+            IconWidget(100, 46, self.get_wifi_icon,
+                       derive=lambda state: (state.wifiConnected, state.wifiError, state.second % 2)),
+        ], background=[
+            # changes once a day, or when the wifi icon shows up
+            TextWidget(14, 50, 114, 14, self.get_date_text, fields=("day", "month", "year"),
+                       derive=lambda state: (state.day, state.month, state.year, state.wifiConnected or state.wifiError),
+                       indent=lambda state: 0 if state.wifiConnected or state.wifiError else 10),
+        ])
+        self.error_screen = Screen(display, [
+            TextWidget(30, 25, 98, 20, lambda state: "ERROR", font=sans20),
+        ])
 
-        self.display.show()
+    def select_screen(self, state: ApplicationState) -> Screen:
+        return self.error_screen if state.errorCode > 0 else self.main_screen
+
+    def get_clock_text(self, state: ApplicationState) -> str:
+        separator = ":" if state.second % 2 == 0 else " "
+        return f"{state.hour:02d}{separator}{state.minute:02d}"
+
+    def get_date_text(self, state: ApplicationState) -> str:
+        return f"{state.day:02d} {self.get_month_name(state.month)} {state.year}"
+
+    def get_wifi_icon(self, state: ApplicationState):
+        if state.wifiConnected:
+            return WIFI_ICON if state.second % 2 == 0 else None
+        if state.wifiError:
+            return WIFI_ERROR_ICON
+        return None
+
+    def fingerprint(self, state: ApplicationState) -> tuple:
+        if state.errorCode > 0:
+            return (True,)
+        # only the parity of the second is visible (colon and wifi blink)
+        return (False, state.hour, state.minute, state.second % 2, state.day, state.month, state.year,
+                state.wifiConnected, state.wifiError)
 
     def get_month_name(self, month: int) -> str:
         month_names = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
         return month_names[month - 1]
 
-class Stat_Display_Painter:
+class Stat_Display_Painter(ScreenPainter):
     def __init__(self, display):
-        self.display = display
+        super().__init__(display, DISPLAY_CONTRAST)
+        offset = 5
+        v_grid_step = 20
+        text_offset = offset + 20
+        self.main_screen = Screen(display, [
+            TextWidget(text_offset, offset + 1, 128 - text_offset, 14,
+                       lambda state: f"{state.eventCount} events", fields=("eventCount",)),
+            TextWidget(text_offset, offset + v_grid_step + 1, 128 - text_offset, 14,
+                       lambda state: f"{state.messageCount} messages", fields=("messageCount",)),
+        ], background=[
+            IconWidget(offset, offset, lambda state: CALENDAR_ICON),
+            IconWidget(offset, offset + v_grid_step, lambda state: EMAIL_ICON),
+            IconWidget(offset, offset + v_grid_step * 2, lambda state: LOCATION_ICON),
+            # the location only changes after a fetch
+            TextWidget(text_offset, offset + v_grid_step * 2 + 1, 128 - text_offset, 14,
+                       self.get_location_text, fields=("location", "timezoneOffset")),
+        ])
+        # with event titles, they scroll along the bottom instead of the location
+        self.ticker = TickerWidget(6, 7, lambda state: state.eventTitles)
+        self.events_screen = Screen(display, [
+            TextWidget(text_offset, offset + 1, 128 - text_offset, 14,
+                       lambda state: f"{state.eventCount} events", fields=("eventCount",)),
+            TextWidget(text_offset, offset + v_grid_step + 1, 128 - text_offset, 14,
+                       lambda state: f"{state.messageCount} messages", fields=("messageCount",)),
+            self.ticker,
+        ], background=[
+            IconWidget(offset, offset, lambda state: CALENDAR_ICON),
+            IconWidget(offset, offset + v_grid_step, lambda state: EMAIL_ICON),
+        ])
+        self.error_screen = Screen(display, [
+            # a long message wraps onto a second line, as the Writer used to do
+            TextWidget(10, 10, 118, 28, lambda state: ErrorCodes.get_error_message(state.errorCode), fields=("errorCode",),
+                       multiline=True),
+            TextWidget(40, 25, 88, 20, lambda state: f"{state.errorCode}", font=sans20, fields=("errorCode",)),
+            TextWidget(10, 45, 118, 14, lambda state: state.errorExtra, fields=("errorExtra",)),
+        ])
 
-    def draw(self, state: ApplicationState):
-        self.display.fill(0)
-        self.display.contrast(DISPLAY_CONTRAST)
+    def select_screen(self, state: ApplicationState) -> Screen:
+        if state.errorCode > 0:
+            return self.error_screen
+        return self.events_screen if state.eventTitles else self.main_screen
+
+    def get_location_text(self, state: ApplicationState) -> str:
+        tz_offset_hours = state.timezoneOffset / 3600
+        tz_sign = "+" if tz_offset_hours >= 0 else "-"
+        return f"{state.location} U{tz_sign}{tz_offset_hours}"
 
+    def fingerprint(self, state: ApplicationState) -> tuple:
         if state.errorCode > 0:
-            draw_text(self.display, ErrorCodes.get_error_message(state.errorCode), 10, 10)
-            draw_text_big(self.display, f"{state.errorCode}", 25, 40)
-            draw_text(self.display, state.errorExtra, 45, 10)
-        else:
-            offset = 5
-            v_grid_step = 20
-            tz_offset_hours = state.timezoneOffset / 3600
-            tz_sign = "+" if tz_offset_hours >= 0 else "-"
-
-            draw_icon_text(self.display, f"{state.eventCount} events", CALENDAR_ICON, offset, offset)
-            draw_icon_text(self.display, f"{state.messageCount} messages", EMAIL_ICON, offset + v_grid_step, offset)
-            draw_icon_text(self.display, f"{state.location} U{tz_sign}{tz_offset_hours}", LOCATION_ICON, offset + v_grid_step * 2, offset)
-
-        self.display.show()
-
-class Temp_Display_Painter:
+            return (True, state.errorCode, state.errorExtra)
+        if state.eventTitles:
+            return (False, state.eventCount, state.messageCount, self.ticker.read_inputs(state))
+        return (False, state.eventCount, state.messageCount, state.location, state.timezoneOffset)
+
+class Temp_Display_Painter(ScreenPainter):
     def __init__(self, display):
-        self.display = display
+        super().__init__(display, DISPLAY_CONTRAST)
+        offset = 25
+        margin = 15
+        self.main_screen = Screen(display, [
+            NumberWidget(25, 10, 6, self.get_temperature_text, digit_width=12, digit_height=18, spacing=4,
+                         fields=("temperature",)),
+        ], background=[
+            IconWidget(offset, 40, lambda state: SUN_ICON),
+            IconWidget(offset + margin + 16, 40, lambda state: RAIN_ICON),
+            IconWidget(offset + (margin + 16) * 2, 40, lambda state: SNOW_ICON),
+        ])
+        self.error_screen = Screen(display, [
+            TextWidget(45, 25, 83, 20, lambda state: self.get_random_emoji(), font=sans20, fields=("errorCode",)),
+        ])
+
+    def select_screen(self, state: ApplicationState) -> Screen:
+        return self.error_screen if state.errorCode > 0 else self.main_screen
 
-    def draw(self, state: ApplicationState):
-        self.display.fill(0)
-        self.display.contrast(DISPLAY_CONTRAST)
+    def get_temperature_text(self, state: ApplicationState) -> str:
+        sign = " " if state.temperature >= 0 else "-"
+        temperature = abs(state.temperature)
+        return f"{sign}{temperature:02d}°C"
 
+    def fingerprint(self, state: ApplicationState) -> tuple:
         if state.errorCode > 0:
-            draw_text_big(self.display, self.get_random_emoji(), 25, 45)
-        else:
-            sign = " " if state.temperature >= 0 else "-"
-            temperature = abs(state.temperature)
-            draw_number(self.display, f"{sign}{temperature:02d}°C", 25, 10, digit_width=12, digit_height=18, spacing=4)
-
-            offset = 25
-            margin = 15
-            draw_icon_pixel_by_pixel(self.display, SUN_ICON, offset, 40)
-            draw_icon_pixel_by_pixel(self.display, RAIN_ICON, offset + margin + 16, 40)
-            draw_icon_pixel_by_pixel(self.display, SNOW_ICON, offset + (margin + 16) * 2, 40)
-        
-        self.display.show()
+            return (True,)
+        return (False, state.temperature)
 
     def get_random_emoji(self) -> str:
         emojis = [">_<", "   :(", "o_O"]
@@ -1,5 +1,4 @@
-import urequests
-import ujson
+from lib import http
 from lib.state import ApplicationState
 from lib.settings import Settings
 
@@ -19,7 +18,7 @@ class Weather:
         else:
             print(f"Weather: {message}")
 
-    def act(self, state: ApplicationState):
+    async def act(self, state: ApplicationState):
         # Only proceed if wifi is connected
         if not state.wifiConnected:
             self.fetchDone = False  # resync when wifi is back
@@ -31,10 +30,10 @@ class Weather:
 
         # Only fetch once
         if not self.fetchDone:
-            self._fetch_weather_data(state)
+            await self._fetch_weather_data(state)
             self.fetchDone = True
 
-    def _fetch_weather_data(self, state: ApplicationState):
+    async def _fetch_weather_data(self, state: ApplicationState):
         if not self.settings.weather_api_key:
             self._log("error", "Weather API key not configured")
             return
@@ -47,10 +46,10 @@ class Weather:
                      latitude=state.latitude,
                      longitude=state.longitude)
 
-            response = urequests.get(url, timeout=5)
+            response = await http.get(url, timeout=5)
 
             if response.status_code == 200:
-                data = ujson.loads(response.text)
+                data = response.json()
 
                 # Extract temperature from the response
                 if "main" in data and "temp" in data["main"]:
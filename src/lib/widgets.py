@@ -0,0 +1,192 @@
+import framebuf
+from lib.state import ApplicationState
+
+class Layer(framebuf.FrameBuffer):
+    """Off-screen framebuffer with the SSD1306 geometry, usable wherever a display is"""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.buffer = bytearray((height // 8) * width)
+        super().__init__(self.buffer, width, height, framebuf.MONO_VLSB)
+
+
+class Widget:
+    """
+    A rectangular part of a screen. It declares the ApplicationState fields it
+    depends on and is only cleared and re-rendered when one of them changes.
+    Pass derive(state) -> tuple to depend on a value computed from the fields
+    instead (e.g. only the parity of the second).
+    """
+
+    def __init__(self, x, y, width, height, fields=(), derive=None):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.fields = fields
+        self.derive = derive
+        self.inputs = None
+        self.valid = False
+
+    def read_inputs(self, state: ApplicationState) -> tuple:
+        if self.derive is not None:
+            return self.derive(state)
+        return tuple(getattr(state, field) for field in self.fields)
+
+    def invalidate(self):
+        self.valid = False
+
+    def overlaps(self, other) -> bool:
+        return (self.x < other.x + other.width and other.x < self.x + self.width
+                and self.y < other.y + other.height and other.y < self.y + self.height)
+
+    def render(self, display, state: ApplicationState):
+        raise NotImplementedError
+
+    def animate(self, display):
+        """Move on between draws (e.g. a ticker); returns ms until the next call is due, None if static"""
+        return None
+
+
+class Screen:
+    """
+    A set of widgets drawn onto one display. Only the widgets whose inputs
+    changed (and the ones overlapping them) are cleared and re-rendered.
+
+    Widgets passed as background are pre-composited into an off-screen
+    layer that is only rebuilt when their inputs change (e.g. the date
+    rolling over). The display then starts from a single copy of the layer
+    instead of fill(0), and clearing a widget restores the layer beneath it.
+    """
+
+    def __init__(self, display, widgets, background=()):
+        self.display = display
+        self.widgets = widgets
+        self.background = background
+        self.layer = Layer(display.width, display.height) if background else None
+        self.layer_inputs = None
+        self.cleared = False
+
+    def invalidate(self):
+        """Redraw everything, including the background layer, on the next draw()"""
+        self.cleared = False
+        self.layer_inputs = None
+
+    def draw(self, state: ApplicationState) -> bool:
+        """Re-render what changed, returns True if the framebuffer was touched"""
+        if self.layer is not None:
+            layer_inputs = tuple(widget.read_inputs(state) for widget in self.background)
+            if layer_inputs != self.layer_inputs:
+                self.layer_inputs = layer_inputs
+                self.layer.fill(0)
+                for widget in self.background:
+                    widget.render(self.layer, state)
+                self.cleared = False
+
+        if not self.cleared:
+            if self.layer is not None:
+                self.display.buffer[:] = self.layer.buffer
+            else:
+                self.display.fill(0)
+            self.cleared = True
+            for widget in self.widgets:
+                widget.invalidate()
+
+        dirty = []
+        for widget in self.widgets:
+            inputs = widget.read_inputs(state)
+            if not widget.valid or inputs != widget.inputs:
+                widget.inputs = inputs
+                widget.valid = True
+                dirty.append(widget)
+        if not dirty:
+            return False
+
+        # clearing a box also erases what overlapping widgets drew there
+        i = 0
+        while i < len(dirty):
+            for widget in self.widgets:
+                if widget not in dirty and widget.overlaps(dirty[i]):
+                    dirty.append(widget)
+            i += 1
+
+        for widget in dirty:
+            self.clear(widget)
+        for widget in self.widgets:  # render in declaration order
+            if widget in dirty:
+                widget.render(self.display, state)
+        return True
+
+    def animate(self):
+        """Animate the rendered widgets, returns ms until the next call is due or None"""
+        delay = None
+        for widget in self.widgets:
+            if widget.valid:
+                due = widget.animate(self.display)
+                if due is not None and (delay is None or due < delay):
+                    delay = due
+        return delay
+
+    def clear(self, widget):
+        if self.layer is None:
+            self.display.fill_rect(widget.x, widget.y, widget.width, widget.height, 0)
+            return
+
+        # copy the layer back into the box, page by page (MONO_VLSB)
+        width = self.display.width
+        x0 = max(widget.x, 0)
+        x1 = min(widget.x + widget.width, width)
+        y0 = max(widget.y, 0)
+        y1 = min(widget.y + widget.height, self.display.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        buf = self.display.buffer
+        layer = self.layer.buffer
+        for page in range(y0 >> 3, ((y1 - 1) >> 3) + 1):
+            top = max(y0 - page * 8, 0)
+            bottom = min(y1 - page * 8, 8)
+            mask = ((1 << (bottom - top)) - 1) << top
+            start = page * width + x0
+            end = page * width + x1
+            if mask == 0xFF:
+                buf[start:end] = layer[start:end]
+            else:
+                keep = ~mask & 0xFF
+                for i in range(start, end):
+                    buf[i] = (buf[i] & keep) | (layer[i] & mask)
+
+
+class ScreenPainter:
+    """
+    Base for painters that show one of several screens. Subclasses build
+    their screens and pick one per state in select_screen().
+    """
+
+    def __init__(self, display, contrast=None):
+        self.display = display
+        self.contrast = contrast
+        self.screen = None
+
+    def select_screen(self, state: ApplicationState) -> Screen:
+        raise NotImplementedError
+
+    def invalidate(self):
+        if self.screen is not None:
+            self.screen.invalidate()
+
+    def animate(self):
+        """Called between draws, see Screen.animate"""
+        return None if self.screen is None else self.screen.animate()
+
+    def draw(self, state: ApplicationState):
+        if self.contrast is not None:
+            self.display.contrast(self.contrast)
+        screen = self.select_screen(state)
+        if screen is not self.screen:
+            if hasattr(self.display, "clear_scroll"):
+                self.display.clear_scroll()  # a ticker on the new screen starts it again
+            screen.invalidate()
+            self.screen = screen
+        if screen.draw(state):
+            self.display.show()
@@ -2,7 +2,6 @@ import network
 import time
 from lib.state import ApplicationState
 from lib.settings import Settings
-from lib.util import throttle
 
 class Wifi:
     CONNECTION_CYCLE_MS = 15 * 60 * 1000  # 15 minutes
@@ -54,7 +53,6 @@ class Wifi:
         if self.logger:
             self.logger.set_wifi_status(False)
 
-    @throttle(1000)
     def act(self, state: ApplicationState):
         now = time.ticks_ms()
 
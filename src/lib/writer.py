@@ -24,6 +24,7 @@
 
 import framebuf
 from uctypes import bytearray_at, addressof
+from lib.font_metrics import FontMetrics
 
 __version__ = (0, 5, 2)
 
@@ -61,12 +62,13 @@ class Writer:
             s.text_col = col
         return s.text_row, s.text_col
 
-    def __init__(self, device, font, verbose=True):
+    def __init__(self, device, font, verbose=True, glyph_cache=None):
         self.devid = _get_id(device)
         self.device = device
         if self.devid not in Writer.state:
             Writer.state[self.devid] = DisplayState()
         self.font = font
+        self.metrics = FontMetrics.for_font(font)  # Width tables for measurement
         if font.height() >= device.height or font.max_width() >= device.width:
             raise ValueError("Font too large for screen")
         # Allow to work with reverse or normal font mapping
@@ -95,6 +97,8 @@ class Writer:
         self.glyph = None  # Current char
         self.char_height = 0
         self.char_width = 0
+        # Optional GlyphCache: glyphs are then ready-to-blit FrameBuffers
+        self.glyph_cache = glyph_cache
 
     def _getstate(self):
         return Writer.state[self.devid]
@@ -127,6 +131,9 @@ class Writer:
 
     def printstring(self, string, invert=False):
         # word wrapping. Assumes words separated by single space.
+        if "\n" not in string:  # Common case: avoid the split
+            self._printline(string, invert)
+            return
         q = string.split("\n")
         last = len(q) - 1
         for n, s in enumerate(q):
@@ -158,41 +165,30 @@ class Writer:
             return 0
         sc = self._getstate().text_col  # Start column
         wd = self.screenwidth
+        metrics = self.metrics
+        if not oh:
+            return metrics.stringlen(string)
         l = 0
-        for char in string[:-1]:
-            _, _, char_width = self.font.get_ch(char)
-            l += char_width
-            if oh and l + sc > wd:
+        last = len(string) - 1
+        n = 0
+        for char in string:
+            if n == last:
+                break
+            l += metrics.width(char)
+            if l + sc > wd:
                 return True  # All done. Save time.
+            n += 1
         char = string[-1]
-        _, _, char_width = self.font.get_ch(char)
-        if oh and l + sc + char_width > wd:
-            l += self._truelen(char)  # Last char might have blank cols on RHS
+        char_width = metrics.width(char)
+        if l + sc + char_width > wd:
+            l += metrics.truelen(char)  # Last char might have blank cols on RHS
         else:
-            l += char_width  # Public method. Return same value as old code.
-        return l + sc > wd if oh else l
+            l += char_width
+        return l + sc > wd
 
     # Return the printable width of a glyph less any blank columns on RHS
     def _truelen(self, char):
-        glyph, ht, wd = self.font.get_ch(char)
-        div, mod = divmod(wd, 8)
-        gbytes = div + 1 if mod else div  # No. of bytes per row of glyph
-        mc = 0  # Max non-blank column
-        data = glyph[(wd - 1) // 8]  # Last byte of row 0
-        for row in range(ht):  # Glyph row
-            for col in range(wd - 1, -1, -1):  # Glyph column
-                gbyte, gbit = divmod(col, 8)
-                if gbit == 0:  # Next glyph byte
-                    data = glyph[row * gbytes + gbyte]
-                if col <= mc:
-                    break
-                if data & (1 << (7 - gbit)):  # Pixel is lit (1)
-                    mc = col  # Eventually gives rightmost lit pixel
-                    break
-            if mc + 1 == wd:
-                break  # All done: no trailing space
-        # print('Truelen', char, wd, mc + 1)  # TEST
-        return mc + 1
+        return self.metrics.truelen(char)
 
     def _get_char(self, char, recurse):
         if not recurse:  # Handle tabs
@@ -212,7 +208,11 @@ class Writer:
         if char == "\n":
             self._newline()
             return
-        glyph, char_height, char_width = self.font.get_ch(char)
+        if self.glyph_cache is not None:
+            entry = self.glyph_cache.get(char)
+            glyph, char_height, char_width = entry[0], entry[1], entry[2]
+        else:
+            glyph, char_height, char_width = self.font.get_ch(char)
         s = self._getstate()
         if s.text_row + char_height > self.screenheight:
             if self.row_clip:
@@ -234,11 +234,17 @@ class Writer:
         self._get_char(char, recurse)
         if self.glyph is None:
             return  # All done
-        buf = bytearray(self.glyph)
-        if invert:
-            for i, v in enumerate(buf):
-                buf[i] = 0xFF & ~v
-        fbc = framebuf.FrameBuffer(buf, self.char_width, self.char_height, self.map)
+        if self.glyph_cache is not None and not invert:
+            fbc = self.glyph  # Cached FrameBuffer
+        else:
+            if self.glyph_cache is not None:
+                buf = bytearray(self.font.get_ch(char)[0])
+            else:
+                buf = bytearray(self.glyph)
+            if invert:
+                for i, v in enumerate(buf):
+                    buf[i] = 0xFF & ~v
+            fbc = framebuf.FrameBuffer(buf, self.char_width, self.char_height, self.map)
         self.device.blit(fbc, s.text_col, s.text_row)
         s.text_col += self.char_width
         self.cpos += 1
@@ -25,7 +25,7 @@ def render_ui():
     state.longitude = 13.4105300
     state.timezoneOffset = 3600
 
-    display1, display2 = get_displays()
+    display1, display2 = get_displays(Settings(), double_buffer=False)
     display1.draw(state)
     display2.draw(state)
 
@@ -0,0 +1,327 @@
+# Rendering micro-benchmarks. Times each painter's draw and the drawing
+# helpers, and counts per iteration the drawing primitives called on the
+# display and on the off-screen layers (pixel, fill_rect, blit, ...), the
+# bytes and transactions sent to the bus and the heap allocated. Runs under
+# CPython (with the util/host stand-ins) and under the MicroPython unix
+# port, from the repository root:
+#
+#   python3 util/bench.py [--out results.jsonl] [--check] [--update]
+#                         [--baseline results.jsonl --time-tolerance FACTOR]
+#   micropython util/bench.py
+#
+# Results are written as JSON lines. --check compares them with
+# util/bench_baseline.jsonl and exits non-zero when a benchmark calls more
+# primitives or sends more bytes than the baseline, or when run on the same
+# runtime allocates more than twice as much. Timings vary between machines,
+# so the committed baseline has none: to check them, save a run with --out
+# and compare a later one on the same machine against it with --baseline
+# and --time-tolerance. --update only rewrites the baseline entries whose
+# counts changed (and adds new benchmarks), never with timings.
+
+import gc
+import json
+import sys
+import time
+
+try:
+    import framebuf
+    RUNTIME = "micropython" if sys.implementation.name == "micropython" else "cpython"
+except ImportError:
+    import hostrender
+    hostrender.install()
+    RUNTIME = "cpython"
+
+if "src" not in sys.path:
+    sys.path.insert(0, "src")
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from lib.ssd1306 import SSD1306_I2C
+from lib.state import ApplicationState
+from lib import ui, widgets, carousel
+from lib.carousel import PageCarousel
+
+BASELINE = "util/bench_baseline.jsonl"
+ITERATIONS = 50
+PRIMITIVES = ("pixel", "fill", "fill_rect", "blit", "hline", "vline", "rect", "scroll")
+
+def ticks_us():
+    if hasattr(time, "ticks_us"):
+        return time.ticks_us()
+    return time.perf_counter_ns() // 1000
+
+def ticks_diff(end, start):
+    if hasattr(time, "ticks_diff"):
+        return time.ticks_diff(end, start)
+    return end - start
+
+class CountingI2C:
+    """Accepts every transfer and counts the bytes and transactions"""
+
+    def __init__(self):
+        self.bytes = 0
+        self.transactions = 0
+
+    def writeto(self, addr, buf, stop=True):
+        self.bytes += len(buf)
+        self.transactions += 1
+
+    def writevto(self, addr, vector, stop=True):
+        for buf in vector:
+            self.bytes += len(buf)
+        self.transactions += 1
+
+# primitive calls of the current measure(), on the display and on every layer
+CALLS = {}
+
+def count(name):
+    CALLS[name] = CALLS.get(name, 0) + 1
+
+def counting(base):
+    """Subclass of the framebuffer class base that counts calls of the drawing primitives"""
+
+    class Counting(base):
+        def pixel(self, *args):
+            count("pixel")
+            return super().pixel(*args)
+
+        def fill(self, *args):
+            count("fill")
+            return super().fill(*args)
+
+        def fill_rect(self, *args):
+            count("fill_rect")
+            return super().fill_rect(*args)
+
+        def blit(self, *args):
+            count("blit")
+            return super().blit(*args)
+
+        def hline(self, *args):
+            count("hline")
+            return super().hline(*args)
+
+        def vline(self, *args):
+            count("vline")
+            return super().vline(*args)
+
+        def rect(self, *args):
+            count("rect")
+            return super().rect(*args)
+
+        def scroll(self, *args):
+            count("scroll")
+            return super().scroll(*args)
+
+    return Counting
+
+class CountingDisplay(counting(SSD1306_I2C)):
+    def __init__(self, i2c):
+        super().__init__(128, 64, i2c)
+
+def count_layers():
+    """
+    Widgets in a background, the ticker's strips and carousel pages draw
+    into layers, not the display; their primitives cost the same and are
+    counted as well
+    """
+    widgets.Layer = counting(widgets.Layer)
+    ui.Layer = counting(ui.Layer)
+    carousel.PageLayer = counting(carousel.PageLayer)
+
+def allocated() -> int:
+    if hasattr(gc, "mem_alloc"):
+        return gc.mem_alloc()
+    return tracemalloc.get_traced_memory()[0]
+
+def frame_state(second=0):
+    state = ApplicationState()
+    state.wifiConnected = True
+    state.hour = 23
+    state.minute = 59
+    state.second = second
+    state.day = 31
+    state.month = 12
+    state.temperature = -2
+    state.eventCount = 10
+    state.messageCount = 20
+    state.location = "Berlin"
+    return state
+
+def measure(name, run, iterations=ITERATIONS) -> dict:
+    """run(display, i) draws iteration i; counters cover the timed iterations only"""
+    i2c = CountingI2C()
+    display = CountingDisplay(i2c)
+    run(display, -1)  # warm up caches and the retained widgets
+    CALLS.clear()
+    i2c.bytes = 0
+    i2c.transactions = 0
+
+    gc.collect()
+    if hasattr(gc, "mem_alloc"):
+        gc.disable()  # mem_alloc() must not drop because of a collection
+    else:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+    alloc_start = allocated()
+    start = ticks_us()
+    for i in range(iterations):
+        run(display, i)
+    elapsed = ticks_diff(ticks_us(), start)
+    if hasattr(gc, "mem_alloc"):
+        alloc = allocated() - alloc_start
+        gc.enable()
+    else:
+        alloc = tracemalloc.get_traced_memory()[1] - alloc_start
+        tracemalloc.stop()
+
+    calls = {}
+    for primitive in PRIMITIVES:
+        calls[primitive] = CALLS.get(primitive, 0) / iterations
+    return {
+        "name": name,
+        "runtime": RUNTIME,
+        "iterations": iterations,
+        "us_per_iter": elapsed / iterations,
+        "calls": calls,
+        "bus_bytes": i2c.bytes / iterations,
+        "bus_transactions": i2c.transactions / iterations,
+        "alloc_bytes": alloc / iterations,
+    }
+
+def painter_bench(painter_class, mode):
+    painters = {}
+
+    def run(display, i):
+        painter = painters.get(display)
+        if painter is None:
+            painter = painter_class(display)
+            painters[display] = painter
+        if mode == "full":
+            painter.invalidate()
+            display.invalidate()
+        # "tick" flips the second every iteration, "steady" keeps it
+        painter.draw(frame_state(i % 2 if mode == "tick" else 0))
+    return run
+
+def carousel_switch_bench():
+    carousels = {}
+
+    def run(display, i):
+        carousel = carousels.get(display)
+        if carousel is None:
+            carousel = PageCarousel(display, [ui.Temp_Display_Painter, ui.Stat_Display_Painter])
+            carousels[display] = carousel
+        carousel.started -= carousel.interval_ms  # next page on every iteration
+        carousel.draw(frame_state())
+    return run
+
+def benchmarks() -> list:
+    count_layers()
+    results = []
+    for painter_class in (ui.Time_Display_Painter, ui.Stat_Display_Painter, ui.Temp_Display_Painter):
+        for mode in ("full", "tick", "steady"):
+            name = painter_class.__name__.lower() + "." + mode
+            results.append(measure(name, painter_bench(painter_class, mode)))
+    results.append(measure("page_carousel.switch", carousel_switch_bench()))
+
+    results.append(measure("draw_text", lambda display, i: ui.draw_text(display, "31 Dec 2025", 50, 14)))
+    results.append(measure("draw_text_big", lambda display, i: ui.draw_text_big(display, "ERROR", 25, 30)))
+    results.append(measure("draw_number", lambda display, i: ui.draw_number(display, "23:59", 12, 10, 18, 30, 4)))
+    results.append(measure("draw_number_segment_by_segment",
+                           lambda display, i: ui.draw_number_segment_by_segment(display, "23:59", 12, 10, 18, 30, 4)))
+    results.append(measure("draw_icon", lambda display, i: ui.draw_icon(display, ui.SUN_ICON, 25, 40)))
+    results.append(measure("draw_icon_pixel_by_pixel",
+                           lambda display, i: ui.draw_icon_pixel_by_pixel(display, ui.SUN_ICON, 25, 40)))
+    return results
+
+def load(path) -> dict:
+    results = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                result = json.loads(line)
+                results[result["name"]] = result
+    return results
+
+def save(path, results):
+    with open(path, "w") as f:
+        for result in results:
+            f.write(json.dumps(result) + "\n")
+
+def changed(result, base) -> bool:
+    """Whether result counts differently from base, beyond what --check tolerates for allocation"""
+    if result["calls"] != base["calls"] or result["runtime"] != base["runtime"]:
+        return True
+    if result["bus_bytes"] != base["bus_bytes"] or result["bus_transactions"] != base["bus_transactions"]:
+        return True
+    return result["alloc_bytes"] > base["alloc_bytes"] * 2 + 64 or base["alloc_bytes"] > result["alloc_bytes"] * 2 + 64
+
+def update_baseline(path, results) -> list:
+    """Re-record the entries that changed, keep the others as they are; returns the names rewritten"""
+    try:
+        baseline = load(path)
+    except OSError:
+        baseline = {}
+    entries = []
+    updated = []
+    for result in results:
+        base = baseline.get(result["name"])
+        if base is None or changed(result, base):
+            base = dict(result)
+            del base["us_per_iter"]  # host timing noise does not belong in the baseline
+            updated.append(result["name"])
+        entries.append(base)
+    save(path, entries)
+    return updated
+
+def regressions(results, baseline, time_tolerance) -> list:
+    problems = []
+    for result in results:
+        base = baseline.get(result["name"])
+        if base is None:
+            continue
+        name = result["name"]
+        for primitive in PRIMITIVES:
+            if result["calls"][primitive] > base["calls"].get(primitive, 0):
+                problems.append(f"{name}: {primitive} calls {result['calls'][primitive]} > {base['calls'].get(primitive, 0)}")
+        for metric in ("bus_bytes", "bus_transactions"):
+            if result[metric] > base[metric]:
+                problems.append(f"{name}: {metric} {result[metric]} > {base[metric]}")
+        if result["runtime"] == base["runtime"]:
+            # allocation and time depend on the runtime, only compare like with like
+            if result["alloc_bytes"] > base["alloc_bytes"] * 2 + 64:
+                problems.append(f"{name}: alloc_bytes {result['alloc_bytes']:.0f} > {base['alloc_bytes']:.0f}")
+            if time_tolerance and "us_per_iter" in base and result["us_per_iter"] > base["us_per_iter"] * time_tolerance:
+                problems.append(f"{name}: {result['us_per_iter']:.0f} us > {base['us_per_iter']:.0f} us")
+    return problems
+
+def main():
+    args = sys.argv[1:]
+    out = args[args.index("--out") + 1] if "--out" in args else None
+    time_tolerance = float(args[args.index("--time-tolerance") + 1]) if "--time-tolerance" in args else None
+    baseline = args[args.index("--baseline") + 1] if "--baseline" in args else BASELINE
+
+    results = benchmarks()
+    for result in results:
+        calls = ", ".join(f"{k}={v:g}" for k, v in result["calls"].items() if v)
+        print(f"{result['name']:<36} {result['us_per_iter']:>10.0f} us  bus {result['bus_bytes']:>6.0f} B"
+              f"  alloc {result['alloc_bytes']:>6.0f} B  {calls}")
+    if out:
+        save(out, results)
+    if "--update" in args:
+        updated = update_baseline(BASELINE, results)
+        print(f"Re-recorded in {BASELINE}:", ", ".join(updated) if updated else "nothing changed")
+    elif "--check" in args:
+        problems = regressions(results, load(baseline), time_tolerance)
+        for problem in problems:
+            print("REGRESSION", problem)
+        if problems:
+            sys.exit(1)
+        print("No regressions against", baseline)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# Measures the text layout cost of one frame's worth of strings, with the
+# layout cache hit and with it missed. Runs on the host or the device:
+#
+#   PYTHONPATH=src python3 util/bench_layout.py
+#   mpremote mount ./src run util/bench_layout.py
+
+import time
+from lib.font_atlas import FontAtlas, font_path
+from lib.layout import TextLayout
+
+try:
+    ticks_us = time.ticks_us
+    ticks_diff = time.ticks_diff
+except AttributeError:  # CPython
+    def ticks_us():
+        return time.perf_counter_ns() // 1000
+
+    def ticks_diff(a, b):
+        return a - b
+
+ITERATIONS = 200
+
+# the atlas the firmware renders with, not the font_to_py module it was built from
+font6 = FontAtlas(font_path("font6.fnt"), cache_size=16)
+
+# date line and the three stat rows, with their boxes
+FRAME = (
+    ("31 Dec 2025", 14, 50, 114, 14),
+    ("10 events", 25, 6, 103, 14),
+    ("20 messages", 25, 26, 103, 14),
+    ("Berlin U+1.0", 25, 46, 103, 14),
+)
+
+def layout_frame(layout):
+    for text, x, y, width, height in FRAME:
+        layout.layout(font6, text, x, y, width, height)
+
+def bench(name, layout, clear):
+    layout_frame(layout)  # warm up the font tables
+    start = ticks_us()
+    for _ in range(ITERATIONS):
+        if clear:
+            layout.clear()
+        layout_frame(layout)
+    elapsed = ticks_diff(ticks_us(), start)
+    print(f"{name}: {elapsed / ITERATIONS:.1f} us/frame (hits {layout.hits}, misses {layout.misses})")
+
+def main():
+    bench("cache hits", TextLayout(), False)
+    bench("cache misses", TextLayout(), True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# Measures display bus throughput: scans the bus like scandev.py, then times
+# repeated full-buffer transfers at a range of clock frequencies and reports
+# the effective bytes/s and failure rate of each.
+#
+# On the device: make run_busprobe
+# The timing and reporting logic only needs a bus object, so it also runs
+# on the host (make busprobe_host) against the emulated buses of util/host:
+# I2C with its wire timing simulated, whose panel must end up holding the
+# payload, and the recording SPI, which must have seen every byte.
+
+import sys
+import time
+
+try:
+    ticks_us = time.ticks_us
+    ticks_diff = time.ticks_diff
+except AttributeError:  # CPython
+    def ticks_us():
+        return time.perf_counter_ns() // 1000
+
+    def ticks_diff(a, b):
+        return a - b
+
+FREQS = (100_000, 400_000, 800_000, 1_000_000)
+ITERATIONS = 20
+FRAME_SIZE = 1024  # full SSD1306 128x64 buffer
+
+def i2c_sender(addr):
+    """Send a buffer as SSD1306 display data (Co=0, D/C#=1)"""
+    write_list = [b"\x40", None]
+
+    def send(bus, payload):
+        write_list[1] = payload
+        bus.writevto(addr, write_list)
+    return send
+
+def spi_send(bus, payload):
+    bus.write(payload)
+
+def probe(open_bus, send, freqs=FREQS, iterations=ITERATIONS, payload=None) -> list:
+    """
+    open_bus(freq) returns the bus clocked at freq, send(bus, payload) does
+    one transfer. Returns a result dict per frequency.
+    """
+    if payload is None:
+        payload = bytearray(FRAME_SIZE)
+    results = []
+    for freq in freqs:
+        result = {"freq": freq, "payload_bytes": len(payload), "transfers": 0, "failures": 0, "bytes_per_s": 0,
+                  "failure_rate": 1.0}
+        results.append(result)
+        try:
+            bus = open_bus(freq)
+        except (OSError, ValueError) as e:
+            print(f"{freq} Hz: cannot open bus: {e}")
+            result["failures"] = iterations
+            continue
+
+        elapsed = 0
+        for _ in range(iterations):
+            start = ticks_us()
+            try:
+                send(bus, payload)
+                elapsed += ticks_diff(ticks_us(), start)
+                result["transfers"] += 1
+            except OSError:
+                result["failures"] += 1
+
+        if result["transfers"] and elapsed > 0:
+            result["bytes_per_s"] = result["transfers"] * len(payload) * 1_000_000 // elapsed
+        result["failure_rate"] = result["failures"] / iterations
+    return results
+
+def report(results):
+    print("freq Hz    bytes/s  ms/frame  failures")
+    for result in results:
+        bytes_per_s = result["bytes_per_s"]
+        ms_per_frame = result["payload_bytes"] * 1000 / bytes_per_s if bytes_per_s else 0
+        print(f"{result['freq']:>7}  {bytes_per_s:>9}  {ms_per_frame:>8.2f}  {result['failure_rate'] * 100:>7.1f}%")
+
+def main():
+    from machine import Pin, I2C
+
+    # SCL -> A5 -> GPIO12, SDA -> A4 -> GPIO11
+    def open_bus(freq):
+        return I2C(0, scl=Pin(12), sda=Pin(11), freq=freq)
+
+    devices = open_bus(FREQS[0]).scan()
+    if not devices:
+        print("No device found - check connections!")
+        return
+    print("I2C device found at:", [hex(device) for device in devices])
+    report(probe(open_bus, i2c_sender(devices[0])))
+
+def host_main():
+    import hostrender
+    hostrender.install()
+    from machine import I2C, SPI
+
+    # a recognisable frame, so the panel contents prove the transfer arrived whole
+    payload = bytearray(i & 0xFF for i in range(FRAME_SIZE))
+    ok = True
+
+    I2C.simulate_timing = True
+    buses = []
+
+    def open_i2c(freq):
+        bus = I2C(0, freq=freq)
+        buses.append(bus)
+        return bus
+
+    print("emulated I2C")
+    results = probe(open_i2c, i2c_sender(0x3C), iterations=3, payload=payload)
+    report(results)
+    for bus, result in zip(buses, results):
+        # 9 clocks per byte, plus the address byte and the control byte
+        wire_limit = result["freq"] * len(payload) // ((len(payload) + 2) * 9)
+        if bytes(bus.panel().ram) != bytes(payload) or result["failures"]:
+            print(f"FAIL {result['freq']} Hz: the panel does not hold the payload")
+            ok = False
+        elif not 0 < result["bytes_per_s"] <= wire_limit:
+            print(f"FAIL {result['freq']} Hz: {result['bytes_per_s']} bytes/s, the wire allows {wire_limit}")
+            ok = False
+
+    buses = []
+
+    def open_spi(freq):
+        bus = SPI(1, baudrate=freq)
+        buses.append(bus)
+        return bus
+
+    print("recording SPI")
+    results = probe(open_spi, spi_send, freqs=(10_000_000, 20_000_000), iterations=3, payload=payload)
+    report(results)
+    for bus, result in zip(buses, results):
+        if bus.bytes_written != result["transfers"] * len(payload) or result["failures"]:
+            print(f"FAIL {result['freq']} Hz: {bus.bytes_written} bytes written for {result['transfers']} transfers")
+            ok = False
+
+    if not ok:
+        sys.exit(1)
+    print("The probe measured the emulated buses correctly")
+
+if __name__ == "__main__":
+    if sys.implementation.name == "micropython":
+        main()
+    else:
+        host_main()
@@ -0,0 +1,62 @@
+# Converts a font_to_py generated font module into a binary font atlas
+# (see src/lib/font_atlas.py for the format). Runs on the host:
+#
+#   python util/font_to_atlas.py src/lib/font6.py src/lib/font6.fnt
+
+import importlib.util
+import os
+import struct
+import sys
+
+# the format constants are shared with the reader, so the two cannot drift apart
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+from lib.font_atlas import MAGIC, VERSION, HEADER_FORMAT, HEADER_SIZE, FLAG_HMAP, FLAG_REVERSE, FLAG_MONOSPACED
+
+def load_font_module(path):
+    spec = importlib.util.spec_from_file_location("font", path)
+    font = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(font)
+    return font
+
+def build_atlas(font) -> bytes:
+    min_ch = font.min_ch()
+    max_ch = font.max_ch()
+    # record 0 is what get_ch returns for unsupported characters
+    default_ch = chr(min_ch - 1) if min_ch > 0 else chr(max_ch + 1)
+    chars = [default_ch] + [chr(code) for code in range(min_ch, max_ch + 1)]
+
+    records = []
+    for ch in chars:
+        glyph, height, width = font.get_ch(ch)
+        records.append(struct.pack("<H", width) + bytes(glyph))
+
+    offsets = [0]
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+
+    flags = 0
+    if font.hmap():
+        flags |= FLAG_HMAP
+    if font.reverse():
+        flags |= FLAG_REVERSE
+    if font.monospaced():
+        flags |= FLAG_MONOSPACED
+
+    header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, font.height(), font.max_width(), flags,
+                         min_ch, max_ch, len(records), max(len(record) for record in records))
+    if len(header) != HEADER_SIZE:
+        raise ValueError("header does not match lib.font_atlas.HEADER_SIZE")
+    index = b"".join(struct.pack("<I", offset) for offset in offsets)
+    return header + index + b"".join(records)
+
+def main():
+    if len(sys.argv) != 3:
+        print("usage: font_to_atlas.py <font module.py> <atlas.fnt>")
+        sys.exit(1)
+    atlas = build_atlas(load_font_module(sys.argv[1]))
+    with open(sys.argv[2], "wb") as f:
+        f.write(atlas)
+    print(f"Wrote {len(atlas)} bytes to {sys.argv[2]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# Golden-frame regression check: renders every painter for a set of
+# representative states on the host and compares the result pixel by pixel
+# with the frames stored in util/golden. Every frame is also rendered over
+# the SPI driver, which must produce the same panel contents, and the
+# recording SPI's log is checked for the driver's transaction behaviour: the
+# bus is configured once, and every command sequence and data window goes
+# out as one CS-low/CS-high burst. Run it before flashing a rendering
+# change; it exits non-zero on any difference.
+#
+#   python3 util/golden.py            compare
+#   python3 util/golden.py --update   re-record the golden frames
+
+import os
+import sys
+
+import hostrender
+
+GOLDEN_DIR = os.path.join(hostrender.UTIL_DIR, "golden")
+FAILURE_DIR = os.path.join(GOLDEN_DIR, "failures")
+
+def scenarios() -> dict:
+    hostrender.install()
+    from lib.error_codes import ErrorCodes
+
+    def state(**fields):
+        s = hostrender.debug_state()
+        for name, value in fields.items():
+            setattr(s, name, value)
+        return s
+
+    return {
+        "wifi_error": state(),
+        "wifi_connected_even": state(wifiConnected=True, wifiError=False, second=10),
+        "wifi_connected_odd": state(wifiConnected=True, wifiError=False, second=11),
+        "wifi_idle": state(wifiError=False, hour=7, minute=5, day=1, month=3),
+        "negative_temperature": state(temperature=-15),
+        "zero_temperature": state(temperature=0),
+        "hot_temperature": state(temperature=104),
+        "negative_timezone": state(timezoneOffset=-5 * 3600, location="New York"),
+        "long_location": state(location="Frankfurt am Main"),
+        "many_events": state(eventCount=123, messageCount=4567),
+        "error_wifi": state(errorCode=ErrorCodes.WIFI_FAILURE, errorExtra="status 201"),
+        "error_timezone": state(errorCode=ErrorCodes.TIMEZONE_FETCH_FAILED, errorExtra="HTTP 503"),
+        "error_long_message": state(errorCode=ErrorCodes.WIFI_WRONG_PASSWORD, errorExtra="status 202"),
+    }
+
+def painters() -> list:
+    hostrender.install()
+    from lib.ui import Time_Display_Painter, Stat_Display_Painter, Temp_Display_Painter
+    return [Time_Display_Painter, Stat_Display_Painter, Temp_Display_Painter]
+
+def spi_bursts(log) -> list:
+    """Split a recording SPI log into (dc, bytes) per CS-low burst, raises on traffic outside one"""
+    bursts = []
+    dc = None
+    burst = None
+    for operation, argument in log:
+        if operation == "dc":
+            if burst is not None:
+                raise AssertionError("DC changed while CS was low")
+            dc = argument
+        elif operation == "cs":
+            if argument == 0:
+                burst = bytearray()
+            elif burst is not None:  # the driver also deasserts CS when it sets the pin up
+                bursts.append((dc, bytes(burst)))
+                burst = None
+        elif operation == "write":
+            if burst is None:
+                raise AssertionError("bytes written while CS was high")
+            burst.extend(argument)
+    return bursts
+
+def spi_transaction_problems(shared_bus) -> list:
+    """Render a full frame and a tick over SPI, returns what the driver did wrong on the bus"""
+    hostrender.install()
+    from machine import SPI, Pin, SSD1306Panel
+    from lib.ssd1306 import SSD1306_SPI
+    from lib.ui import Time_Display_Painter
+
+    spi = SPI(1)
+    dc, res, cs = Pin(5), Pin(6), Pin(10)
+    spi.attach(dc, cs)
+    display = SSD1306_SPI(hostrender.WIDTH, hostrender.HEIGHT, spi, dc, res, cs, shared_bus=shared_bus)
+    painter = Time_Display_Painter(display)
+    for state in (scenarios()["wifi_connected_even"], scenarios()["wifi_connected_odd"]):
+        painter.draw(state)
+
+    problems = []
+    try:
+        bursts = spi_bursts(spi.log)
+    except AssertionError as e:
+        return [str(e)]
+    inits = sum(1 for operation, _ in spi.log if operation == "init")
+    expected_inits = 1 + len(bursts) if shared_bus else 1
+    if inits != expected_inits:
+        problems.append(f"the bus was configured {inits} times, expected {expected_inits}")
+    if len(bursts) != display.transactions:
+        problems.append(f"{len(bursts)} CS bursts for {display.transactions} transactions")
+    # a command sequence must not be split across bursts
+    panel = SSD1306Panel()
+    for dc_value, data in bursts:
+        if dc_value == 0:
+            for byte in data:
+                panel.command(byte)
+            if panel.pending:
+                problems.append(f"command {bytes(panel.pending).hex()} split across CS bursts")
+                panel.pending = []
+    return problems
+
+def frame_name(painter_class, scenario) -> str:
+    return f"{painter_class.__name__.lower()}-{scenario}"
+
+def main():
+    update = "--update" in sys.argv
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    failures = 0
+    checked = 0
+    for scenario, state in scenarios().items():
+        for painter_class in painters():
+            name = frame_name(painter_class, scenario)
+            path = os.path.join(GOLDEN_DIR, name + ".pbm")
+            pixels = hostrender.frame_pixels(hostrender.render(painter_class, state))
+            if update:
+                hostrender.write_pbm(path, pixels)
+                continue
+            checked += 1
+            if not os.path.exists(path):
+                print(f"MISSING {name}: run with --update to record it")
+                failures += 1
+                continue
+            if hostrender.render(painter_class, state, bus="spi") != hostrender.render(painter_class, state):
+                print(f"FAIL {name}: the SPI panel shows a different frame than the I2C one")
+                failures += 1
+                continue
+            differing = hostrender.diff_count(hostrender.read_pbm(path), pixels)
+            if differing:
+                failures += 1
+                os.makedirs(FAILURE_DIR, exist_ok=True)
+                hostrender.write_png(os.path.join(FAILURE_DIR, name + ".actual.png"), pixels)
+                hostrender.write_png(os.path.join(FAILURE_DIR, name + ".golden.png"), hostrender.read_pbm(path))
+                print(f"FAIL {name}: {differing} pixels differ, see {FAILURE_DIR}")
+
+    if update:
+        print(f"Recorded golden frames in {GOLDEN_DIR}")
+        return
+    for shared_bus in (False, True):
+        for problem in spi_transaction_problems(shared_bus):
+            print(f"FAIL SPI transactions{' on a shared bus' if shared_bus else ''}: {problem}")
+            failures += 1
+    print(f"{checked - failures}/{checked} frames match")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
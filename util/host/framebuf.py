@@ -0,0 +1,97 @@
+# CPython stand-in for MicroPython's framebuf module, enough for the
+# drivers and painters in src/lib. Pixels live in the caller's buffer in
+# the same layout as on the device, so frames can be compared byte for
+# byte with what the firmware would send to the panel.
+
+MONO_VLSB = 0
+MONO_HLSB = 3
+MONO_HMSB = 4
+
+class FrameBuffer:
+    def __init__(self, buffer, width, height, format, stride=None):
+        if memoryview(buffer).readonly:
+            raise TypeError("object with buffer protocol required")
+        if format not in (MONO_VLSB, MONO_HLSB, MONO_HMSB):
+            raise ValueError("invalid format")
+        self._buffer = buffer
+        self._width = width
+        self._height = height
+        self._format = format
+        self._stride = width if stride is None else stride
+
+    def _address(self, x, y):
+        """Byte index and bit of the pixel"""
+        if self._format == MONO_VLSB:
+            return (y >> 3) * self._stride + x, y & 7
+        index = (y * ((self._stride + 7) & ~7) + x) >> 3
+        if self._format == MONO_HLSB:
+            return index, 7 - (x & 7)
+        return index, x & 7
+
+    def _get(self, x, y):
+        index, bit = self._address(x, y)
+        return (self._buffer[index] >> bit) & 1
+
+    def _set(self, x, y, c):
+        index, bit = self._address(x, y)
+        if c:
+            self._buffer[index] |= 1 << bit
+        else:
+            self._buffer[index] &= ~(1 << bit) & 0xFF
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            return None
+        if c is None:
+            return self._get(x, y)
+        self._set(x, y, c)
+
+    def fill(self, c):
+        value = 0xFF if c else 0
+        for i in range(len(self._buffer)):
+            self._buffer[i] = value
+
+    def fill_rect(self, x, y, w, h, c):
+        for yy in range(max(y, 0), min(y + h, self._height)):
+            for xx in range(max(x, 0), min(x + w, self._width)):
+                self._set(xx, yy, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def hline(self, x, y, w, c):
+        if 0 <= y < self._height:
+            for xx in range(max(x, 0), min(x + w, self._width)):
+                self._set(xx, y, c)
+
+    def vline(self, x, y, h, c):
+        if 0 <= x < self._width:
+            for yy in range(max(y, 0), min(y + h, self._height)):
+                self._set(x, yy, c)
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        for sy in range(max(0, -y), min(fbuf._height, self._height - y)):
+            for sx in range(max(0, -x), min(fbuf._width, self._width - x)):
+                c = fbuf._get(sx, sy)
+                if palette is not None:
+                    c = palette._get(c, 0)
+                if c != key:
+                    self._set(x + sx, y + sy, c)
+
+    def scroll(self, dx, dy):
+        pixels = [[self._get(x, y) for x in range(self._width)] for y in range(self._height)]
+        for y in range(self._height):
+            for x in range(self._width):
+                sx = x - dx
+                sy = y - dy
+                if 0 <= sx < self._width and 0 <= sy < self._height:
+                    self._set(x, y, pixels[sy][sx])
+
+    def text(self, s, x, y, c=1):
+        raise NotImplementedError("the 8x8 font is not available on the host")
@@ -0,0 +1,208 @@
+# CPython stand-in for the parts of MicroPython's machine module the clock
+# uses. I2C and SPI emulate an SSD1306 on the bus: they interpret the command
+# stream into a GDDRAM image, so a host render shows what the panel would
+# display.
+
+import time
+
+class Pin:
+    IN = 0
+    OUT = 1
+
+    def __init__(self, id, mode=-1, value=None):
+        self.id = id
+        self._value = value or 0
+        self.listeners = []  # called as listener(pin, value) on every write
+
+    def init(self, mode=-1, value=None):
+        if value is not None:
+            self(value)
+
+    def __call__(self, value=None):
+        if value is None:
+            return self._value
+        self._value = value
+        for listener in self.listeners:
+            listener(self, value)
+
+    def value(self, value=None):
+        return self(value)
+
+
+class SSD1306Panel:
+    """
+    GDDRAM and address pointer of an SSD1306 in horizontal addressing mode.
+    The panel's horizontal scroll moves the GDDRAM contents themselves;
+    step_scroll() does that for one step of the scroll set up last.
+    """
+
+    # number of argument bytes following each multi-byte command
+    ARGS = {0x20: 1, 0x21: 2, 0x22: 2, 0x26: 6, 0x27: 6, 0x81: 1, 0x8D: 1, 0xA8: 1,
+            0xAD: 1, 0xD3: 1, 0xD5: 1, 0xD9: 1, 0xDA: 1, 0xDB: 1}
+
+    def __init__(self, width=128, pages=8):
+        self.width = width
+        self.pages = pages
+        self.ram = bytearray(width * pages)
+        self.commands = []  # complete commands, as tuples
+        self.pending = []
+        self.columns = (0, width - 1)
+        self.page_range = (0, pages - 1)
+        self.column = 0
+        self.page = 0
+        self.scroll = None  # the last 0x26/0x27 command
+        self.scrolling = False
+
+    def command(self, byte):
+        self.pending.append(byte)
+        if len(self.pending) <= self.ARGS.get(self.pending[0], 0):
+            return
+        command = tuple(self.pending)
+        self.pending = []
+        self.commands.append(command)
+        if command[0] == 0x21:
+            self.columns = (command[1], command[2])
+            self.column = command[1]
+        elif command[0] == 0x22:
+            self.page_range = (command[1], command[2])
+            self.page = command[1]
+        elif command[0] in (0x26, 0x27):
+            self.scroll = command
+        elif command[0] == 0x2F:
+            self.scrolling = self.scroll is not None
+        elif command[0] == 0x2E:
+            self.scrolling = False
+
+    def step_scroll(self):
+        """Move the scrolled pages one column, wrapping around"""
+        if not self.scrolling:
+            return
+        for page in range(self.scroll[2], self.scroll[4] + 1):
+            row = self.ram[page * self.width:(page + 1) * self.width]
+            if self.scroll[0] == 0x27:  # left: each column takes its right neighbour
+                row = row[1:] + row[:1]
+            else:
+                row = row[-1:] + row[:-1]
+            self.ram[page * self.width:(page + 1) * self.width] = row
+
+    def data(self, byte):
+        self.ram[self.page * self.width + self.column] = byte
+        self.column += 1
+        if self.column > self.columns[1]:
+            self.column = self.columns[0]
+            self.page += 1
+            if self.page > self.page_range[1]:
+                self.page = self.page_range[0]
+
+
+class I2C:
+    # set to True to sleep for the time the transfer would take on the wire
+    simulate_timing = False
+
+    def __init__(self, id=0, scl=None, sda=None, freq=400_000):
+        self.id = id
+        self.freq = freq
+        self.panels = {}  # address -> SSD1306Panel
+        self.transactions = 0
+        self.bytes_written = 0
+
+    def init(self, scl=None, sda=None, freq=400_000):
+        self.freq = freq
+
+    def scan(self):
+        return [0x3C]
+
+    def panel(self, addr=0x3C) -> SSD1306Panel:
+        if addr not in self.panels:
+            self.panels[addr] = SSD1306Panel()
+        return self.panels[addr]
+
+    def writeto(self, addr, buf, stop=True):
+        self._transfer(addr, bytes(buf))
+        return len(buf)
+
+    def writevto(self, addr, vector, stop=True):
+        self._transfer(addr, b"".join(bytes(buf) for buf in vector))
+
+    def _transfer(self, addr, payload):
+        self.transactions += 1
+        self.bytes_written += len(payload)
+        if self.simulate_timing:
+            # address byte plus payload, 9 clocks per byte
+            time.sleep((len(payload) + 1) * 9 / self.freq)
+        panel = self.panel(addr)
+        control = payload[0]
+        if control == 0x80:  # Co=1, D/C#=0: a single command byte
+            panel.command(payload[1])
+        elif control == 0x00:  # Co=0, D/C#=0: a stream of commands
+            for byte in payload[1:]:
+                panel.command(byte)
+        elif control == 0x40:  # Co=0, D/C#=1: display data
+            for byte in payload[1:]:
+                panel.data(byte)
+
+
+class SPI:
+    """
+    Records every bus operation in log as (operation, argument) tuples. After
+    attach(dc, cs) the DC and CS pin writes are logged too, and the bytes
+    written while CS is low are fed to an emulated SSD1306 as commands or
+    data depending on DC.
+    """
+
+    def __init__(self, id=1, baudrate=1_000_000, polarity=0, phase=0, sck=None, mosi=None, miso=None):
+        self.id = id
+        self.baudrate = baudrate
+        self.log = []
+        self.panels = {}  # CS pin id -> SSD1306Panel
+        self.selected = None
+        self.dc = {}  # CS pin id -> DC pin
+        self.transactions = 0
+        self.bytes_written = 0
+
+    def init(self, baudrate=1_000_000, polarity=0, phase=0, **kwargs):
+        self.baudrate = baudrate
+        self.log.append(("init", baudrate))
+
+    def attach(self, dc, cs) -> SSD1306Panel:
+        """Wire a panel selected by cs, returns its emulation"""
+        self.dc[cs.id] = dc
+        dc.listeners.append(lambda pin, value: self.log.append(("dc", value)))
+        cs.listeners.append(self._select)
+        return self.panel(cs.id)
+
+    def panel(self, cs_id) -> SSD1306Panel:
+        if cs_id not in self.panels:
+            self.panels[cs_id] = SSD1306Panel()
+        return self.panels[cs_id]
+
+    def _select(self, pin, value):
+        self.log.append(("cs", value))
+        if value == 0:
+            self.selected = pin.id
+            self.transactions += 1
+        else:
+            self.selected = None
+
+    def write(self, buf):
+        self.log.append(("write", bytes(buf)))
+        self.bytes_written += len(buf)
+        if self.selected is None:
+            return
+        panel = self.panel(self.selected)
+        if self.dc[self.selected]():
+            for byte in bytes(buf):
+                panel.data(byte)
+        else:
+            for byte in bytes(buf):
+                panel.command(byte)
+
+
+class RTC:
+    def __init__(self):
+        self._datetime = (2025, 1, 1, 2, 0, 0, 0, 0)
+
+    def datetime(self, datetime=None):
+        if datetime is None:
+            return self._datetime
+        self._datetime = datetime
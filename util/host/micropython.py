@@ -0,0 +1,4 @@
+# CPython stand-in for the micropython module
+
+def const(value):
+    return value
@@ -0,0 +1,5 @@
+# Placeholder credentials for host runs, see src/secrets.example.py
+WIFI_SSID = "host"
+WIFI_PASSWORD = ""
+DASH0_AUTH_TOKEN = ""
+WEATHER_API_KEY = "host"
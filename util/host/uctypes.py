@@ -0,0 +1,7 @@
+# CPython stand-in for uctypes; only CWriter (colour displays) needs it
+
+def addressof(obj):
+    raise NotImplementedError("uctypes is not available on the host")
+
+def bytearray_at(address, size):
+    raise NotImplementedError("uctypes is not available on the host")
@@ -0,0 +1,185 @@
+# Headless rendering of the painters in src/lib/ui.py on the host (CPython).
+# The stand-ins in util/host replace framebuf, machine, micropython and
+# uctypes; the emulated I2C panel turns the driver's bus traffic back into a
+# GDDRAM image, which is what gets written out and compared.
+#
+#   python3 util/hostrender.py [out_dir]     renders render_ui.py's state
+#
+# NumPy is used for frame comparison when installed, plain Python otherwise.
+
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+
+UTIL_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(UTIL_DIR), "src")
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+WIDTH = 128
+HEIGHT = 64
+
+def install():
+    """Make the firmware modules importable under CPython"""
+    for path in (SRC_DIR, os.path.join(UTIL_DIR, "host")):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    if not hasattr(time, "ticks_ms"):
+        # MicroPython's time extensions; host ints never wrap around
+        time.ticks_ms = lambda: time.monotonic_ns() // 1_000_000
+        time.ticks_us = lambda: time.monotonic_ns() // 1000
+        time.ticks_diff = lambda end, start: end - start
+        time.ticks_add = lambda ticks, delta: ticks + delta
+        time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+        time.sleep_us = lambda us: time.sleep(us / 1_000_000)
+
+def render(painter_class, state, seed=0, bus="i2c") -> bytes:
+    """Draw state with a fresh painter on an "i2c" or "spi" panel, returns the panel's GDDRAM"""
+    install()
+    from machine import I2C, SPI, Pin
+    from lib.ssd1306 import SSD1306_I2C, SSD1306_SPI
+
+    if bus == "spi":
+        spi = SPI(1)
+        dc, res, cs = Pin(5), Pin(6), Pin(10)
+        panel = spi.attach(dc, cs)
+        display = SSD1306_SPI(WIDTH, HEIGHT, spi, dc, res, cs)
+    else:
+        i2c = I2C(0)
+        panel = i2c.panel()
+        display = SSD1306_I2C(WIDTH, HEIGHT, i2c)
+    painter = painter_class(display)
+    random.seed(seed)  # the temp error screen picks a random emoji
+    painter.draw(state)
+    ram = bytes(panel.ram)
+    if ram != bytes(display.buffer):
+        raise AssertionError("panel GDDRAM differs from the frame buffer after show()")
+    return ram
+
+def frame_pixels(ram, width=WIDTH, height=HEIGHT):
+    """Unpack MONO_VLSB GDDRAM into rows of 0/1 pixels"""
+    if numpy is not None:
+        pages = numpy.frombuffer(ram, dtype=numpy.uint8).reshape(height // 8, width)
+        bits = numpy.unpackbits(pages[:, :, None], axis=2, bitorder="little")  # page, x, bit
+        return bits.transpose(0, 2, 1).reshape(height, width)
+    rows = []
+    for y in range(height):
+        page = (y >> 3) * width
+        bit = y & 7
+        rows.append(bytes((ram[page + x] >> bit) & 1 for x in range(width)))
+    return rows
+
+def diff_count(a, b) -> int:
+    """Number of pixels that differ between two frame_pixels() results"""
+    if numpy is not None:
+        return int(numpy.count_nonzero(numpy.asarray(a) != numpy.asarray(b)))
+    return sum(pa != pb for row_a, row_b in zip(a, b) for pa, pb in zip(row_a, row_b))
+
+def _packed_rows(pixels):
+    # 1 bit per pixel, MSB first, 1 = black for PBM
+    for row in pixels:
+        packed = bytearray((len(row) + 7) // 8)
+        for x, pixel in enumerate(row):
+            if pixel:
+                packed[x >> 3] |= 0x80 >> (x & 7)
+        yield bytes(packed)
+
+def write_pbm(path, pixels):
+    """Lit pixels are written black"""
+    height = len(pixels)
+    width = len(pixels[0])
+    with open(path, "wb") as f:
+        f.write(f"P4\n{width} {height}\n".encode())
+        for row in _packed_rows(pixels):
+            f.write(row)
+
+def read_pbm(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    fields = data.split(maxsplit=3)
+    if fields[0] != b"P4":
+        raise ValueError(f"{path} is not a binary PBM")
+    width = int(fields[1])
+    height = int(fields[2])
+    raw = fields[3]
+    row_bytes = (width + 7) // 8
+    rows = []
+    for y in range(height):
+        row = raw[y * row_bytes:(y + 1) * row_bytes]
+        rows.append(bytes((row[x >> 3] >> (7 - (x & 7))) & 1 for x in range(width)))
+    if numpy is not None:
+        return numpy.array([list(row) for row in rows], dtype=numpy.uint8)
+    return rows
+
+def write_png(path, pixels, scale=4):
+    """Lit pixels are written white on black, like the OLED, scaled up"""
+    height = len(pixels)
+    width = len(pixels[0])
+    raw = bytearray()
+    for row in pixels:
+        line = bytearray()
+        for pixel in row:
+            line.extend((0xFF if pixel else 0x00,) * scale)
+        for _ in range(scale):
+            raw.append(0)  # filter type: none
+            raw.extend(line)
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width * scale, height * scale, 8, 0, 0, 0, 0)  # 8-bit greyscale
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", header))
+        f.write(chunk(b"IDAT", zlib.compress(bytes(raw), 9)))
+        f.write(chunk(b"IEND", b""))
+
+def debug_state():
+    """The state render_ui.py shows on the device"""
+    install()
+    from lib.state import ApplicationState
+
+    state = ApplicationState()
+    state.wifiConnected = False
+    state.wifiError = True
+    state.hour = 23
+    state.minute = 59
+    state.second = 0
+    state.day = 31
+    state.month = 12
+    state.year = 2025
+    state.temperature = -2
+    state.errorCode = 0
+    state.errorExtra = ""
+    state.eventCount = 10
+    state.messageCount = 20
+    state.location = "Berlin"
+    state.locationCode = "Europe/Berlin"
+    state.latitude = 52.5243700
+    state.longitude = 13.4105300
+    state.timezoneOffset = 3600
+    return state
+
+def main():
+    install()
+    from lib.ui import Time_Display_Painter, Stat_Display_Painter, Temp_Display_Painter
+
+    out_dir = sys.argv[1] if len(sys.argv) > 1 else "render_out"
+    os.makedirs(out_dir, exist_ok=True)
+    state = debug_state()
+    for painter_class in (Time_Display_Painter, Stat_Display_Painter, Temp_Display_Painter):
+        pixels = frame_pixels(render(painter_class, state))
+        name = os.path.join(out_dir, painter_class.__name__.lower())
+        write_pbm(name + ".pbm", pixels)
+        write_png(name + ".png", pixels)
+        print(f"Wrote {name}.pbm and {name}.png")
+
+if __name__ == "__main__":
+    main()
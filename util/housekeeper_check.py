@@ -0,0 +1,121 @@
+# Checks the housekeeper's garbage collection policy on the host, where gc
+# has none of MicroPython's extensions: a fake gc with mem_free(),
+# mem_alloc(), threshold() and collect() stands in, and a fake clock moves
+# on by the pause of every collection. A due collection must run from the
+# slack after a frame, but not when the slack is smaller than the longest
+# pause plus the margin; act() must force one once no frame gave it the
+# chance for three intervals; and a requested report must arrive exactly
+# once, after the largest free block bisection, with the block measured.
+#
+#   python3 util/housekeeper_check.py
+
+import sys
+import time
+
+import hostrender
+
+HEAP = 200_000
+LARGEST_BLOCK = 20_000  # of the fragmented heap
+PAUSE_US = 30_000
+
+clock = [0]
+
+class FakeGC:
+    """MicroPython's gc on a heap whose free memory is split into blocks"""
+
+    def __init__(self):
+        self.free = HEAP // 2
+        self.collections = 0
+
+    def mem_free(self):
+        return self.free
+
+    def mem_alloc(self):
+        return HEAP - self.free
+
+    def threshold(self, amount):
+        self.threshold_bytes = amount
+
+    def collect(self):
+        clock[0] += PAUSE_US
+        self.collections += 1
+
+    def allocate(self, size):
+        """bytearray(size): a failed allocation collects before it gives up"""
+        if size > LARGEST_BLOCK:
+            self.collect()
+            raise MemoryError
+        return bytes(size)
+
+def install(fake):
+    hostrender.install()
+    time.ticks_us = lambda: clock[0]
+    time.ticks_ms = lambda: clock[0] // 1000
+    from lib import housekeeper
+    housekeeper.gc = fake
+    housekeeper.bytearray = fake.allocate
+    return housekeeper.Housekeeper
+
+def problems() -> list:
+    fake = FakeGC()
+    Housekeeper = install(fake)
+    keeper = Housekeeper()
+    if not keeper.supported or keeper.watermark != HEAP // 8:
+        return ["the fake gc was not picked up"]
+
+    # one collection sets the longest pause
+    clock[0] += Housekeeper.COLLECT_INTERVAL_MS * 1000
+    keeper.after_frame(1000)
+    if keeper.collections != 1 or keeper.pause_max_us != PAUSE_US:
+        return [f"a due collection did not run from the slack ({keeper.collections} collections)"]
+
+    # too little slack for the pause: skipped, even below the watermark
+    fake.free = keeper.watermark - 1
+    keeper.after_frame(PAUSE_US // 1000 + Housekeeper.PAUSE_MARGIN_MS - 1)
+    if keeper.collections != 1:
+        return ["a collection ran although the slack was smaller than the pause plus the margin"]
+    keeper.after_frame(PAUSE_US // 1000 + Housekeeper.PAUSE_MARGIN_MS)
+    if keeper.collections != 2:
+        return ["a collection below the watermark did not run from the slack"]
+    fake.free = HEAP // 2
+
+    # frames leave no slack: act() steps in after three intervals, not before
+    last = clock[0]
+    clock[0] = last + (3 * Housekeeper.COLLECT_INTERVAL_MS - 1) * 1000
+    keeper.after_frame(0)
+    keeper.act()
+    if keeper.collections != 2:
+        return ["act() forced a collection before three intervals passed"]
+    clock[0] = last + 3 * Housekeeper.COLLECT_INTERVAL_MS * 1000
+    keeper.act()
+    if keeper.collections != 3 or keeper.forced != 1:
+        return [f"act() did not force a collection after three intervals ({keeper.forced} forced)"]
+
+    reports = []
+    keeper.request_report(reports.append)
+    delivered = None
+    for frame in range(40):
+        keeper.after_frame(1000)
+        if keeper.collections != 3:
+            return [f"frame {frame} of the report ran a collection of its own"]
+        if reports and delivered is None:
+            delivered = frame
+    if len(reports) != 1:
+        return [f"{len(reports)} reports were delivered instead of one"]
+    report = reports[0]
+    block = report.get("largest_free_block")
+    if block is None or not LARGEST_BLOCK - 64 <= block <= LARGEST_BLOCK:
+        return [f"the largest free block was measured as {block}, not {LARGEST_BLOCK}"]
+    print(f"report after {delivered} probe frames, {fake.collections - 3} failed allocations: {report}")
+    return []
+
+def main():
+    found = problems()
+    for problem in found:
+        print("FAIL", problem)
+    if found:
+        sys.exit(1)
+    print("The housekeeper collected in the slack and measured the heap")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# Checks on the host (CPython asyncio) that the runtime keeps the clock's
+# deadlines while a network fetch is in flight: a local HTTP server answers
+# the weather request only after FETCH_DELAY_S, and meanwhile the clock,
+# rendering the time display on every second edge, must not fall behind:
+# the lag between the edge and the flushed frame has to stay below
+# MAX_LATE_MS and a periodic job must not start later than that either.
+# A second run checks that an async job blocking between its awaits is
+# counted as an overrun although its wall time has no budget.
+#
+#   python3 util/runtime_check.py
+
+import asyncio
+import sys
+import time
+
+import hostrender
+
+FETCH_DELAY_S = 2
+RUN_S = 4
+MAX_LATE_MS = 50
+
+async def slow_weather_server(reader, writer):
+    await reader.readuntil(b"\r\n\r\n")
+    await asyncio.sleep(FETCH_DELAY_S)
+    writer.write(b'HTTP/1.0 200 OK\r\nContent-Type: application/json\r\n\r\n{"main": {"temp": 21.6}}')
+    await writer.drain()
+    writer.close()
+
+async def check() -> bool:
+    hostrender.install()
+    from machine import I2C
+    from lib.display_manager import DisplayManager
+    from lib.instrumentation import Instrumentation
+    from lib.runtime import Runtime
+    from lib.second_ticker import SecondTicker
+    from lib.settings import Settings
+    from lib.ssd1306 import SSD1306_I2C
+    from lib.ui import Time_Display_Painter
+    from lib.weather import Weather
+
+    server = await asyncio.start_server(slow_weather_server, "127.0.0.1", 0)
+    Weather.API_URL = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/data"
+
+    state = hostrender.debug_state()
+    state.wifiConnected = True
+    state.wifiError = False
+    displays = DisplayManager()
+    displays.add(Time_Display_Painter(SSD1306_I2C(128, 64, I2C(0))), "second")
+    weather = Weather(Settings(), None)
+
+    ticker = SecondTicker(lambda: int(time.time()) % 60)
+
+    async def clock_loop():
+        while True:
+            await ticker.wait_edge()
+            state.second = int(time.time()) % 60
+            t0 = time.ticks_us()
+            displays.render(state)
+            timings.record("render", time.ticks_diff(time.ticks_us(), t0))
+            ticker.record_flush()
+
+    timings = Instrumentation()
+    runtime = Runtime(timings)
+    runtime.spawn("ui", clock_loop)
+    wifi = runtime.every("wifi", 100, lambda: None)
+    runtime.every_async("weather", 1000, lambda: weather.act(state))
+    try:
+        await asyncio.wait_for(runtime.main(), RUN_S)
+    except asyncio.TimeoutError:
+        pass
+    server.close()
+
+    for stats in runtime.stats():
+        print(f"{stats['job']:<8} runs {stats['runs']:>3}  errors {stats['errors']}  max late {stats['max_late_ms']} ms")
+    timings.dump()
+    clock = ticker.stats()
+    print(f"clock    edges {clock['edges']}  misses {clock['misses']}  lag avg {clock['lag_avg_us']} us"
+          f"  max {clock['lag_max_us']} us")
+    ok = True
+    if state.temperature != 21:
+        print(f"FAIL the weather fetch did not complete (temperature {state.temperature})")
+        ok = False
+    if clock["edges"] < RUN_S - 1 or clock["lag_max_us"] > MAX_LATE_MS * 1000:
+        print(f"FAIL the clock fell behind the second edges while the fetch was in flight")
+        ok = False
+    if wifi.late_max_ms > MAX_LATE_MS:
+        print(f"FAIL a periodic job started {wifi.late_max_ms} ms late while the fetch was in flight")
+        ok = False
+    return ok
+
+async def check_blocking() -> bool:
+    hostrender.install()
+    from lib.instrumentation import Instrumentation, TICK_BUDGET_US
+    from lib.runtime import Runtime
+
+    async def parse():
+        await asyncio.sleep(0.01)
+        time.sleep(TICK_BUDGET_US * 1.2 / 1_000_000)  # e.g. parsing a large response
+        await asyncio.sleep(0.01)
+
+    timings = Instrumentation()
+    runtime = Runtime(timings)
+    runtime.every_async("parse", 10_000, parse)
+    try:
+        await asyncio.wait_for(runtime.main(), 0.5)
+    except asyncio.TimeoutError:
+        pass
+    block = timings.histogram("parse.block")
+    if block.count != 1 or block.overruns != 1 or timings.histogram("parse").overruns:
+        print(f"FAIL the blocking slice of an async job was not counted as an overrun "
+              f"(n={block.count} over={block.overruns} max={block.max_us} us)")
+        return False
+    return True
+
+def main():
+    if not asyncio.run(check()) or not asyncio.run(check_blocking()):
+        sys.exit(1)
+    print("The UI kept its deadlines during the fetch")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# Checks the event ticker on the host: the stat painter shows long event
+# titles on an emulated I2C panel whose hardware scroll is stepped in
+# lockstep with a fake clock running at the driver's nominal scroll rate.
+# After every step (and after catching up on several missed ones) the
+# scrolled band must show the titles as one continuous marquee, and a
+# redraw elsewhere on the panel must not stop the scroll. The same is then
+# checked on the panel as get_displays() wires it, where the stat page is
+# one page of a carousel: the panel must be told to scroll when the page
+# comes up and to stop when it goes.
+#
+#   python3 util/ticker_check.py
+
+import sys
+import time
+
+import hostrender
+
+TITLES = ("Quarterly planning with the whole platform team", "Standup", "1:1")
+BAND_PAGES = (6, 7)
+
+clock = [0]
+
+def install():
+    hostrender.install()
+    time.ticks_us = lambda: clock[0]
+    time.ticks_ms = lambda: clock[0] // 1000
+
+def marquee(ticker):
+    """tape(position, page): the band's byte at a position of the titles laid end to end"""
+    from lib.ui import TICKER_STRIP_WIDTH
+    from lib.widgets import Layer
+
+    strips = []
+    for title in TITLES:
+        strip = Layer(TICKER_STRIP_WIDTH, 16)
+        strips.append((strip, ticker.draw_strip(strip, title)))
+
+    def tape(position, page):
+        while True:
+            for strip, width in strips:
+                if position < width:
+                    return strip.buffer[page * TICKER_STRIP_WIDTH + position]
+                position -= width
+    return tape, sum(width for _, width in strips)
+
+def scroll_problems(panel, display, ticker, animate, steps, redraw=None) -> list:
+    """Step the panel's scroll and the clock together, returns where the band went wrong"""
+    if not panel.scrolling or panel.scroll[0] != 0x27 or panel.scroll[2:5:2] != BAND_PAGES:
+        return [f"the panel was not told to scroll pages {BAND_PAGES} left: {panel.scroll}"]
+    tape, _ = marquee(ticker)
+    step_us = display.scroll_step_us()
+    step = 0
+    while step < steps:
+        # now and then the animation falls a few steps behind
+        behind = 3 if step % 37 == 36 else 1
+        for _ in range(behind):
+            clock[0] += step_us
+            panel.step_scroll()
+            step += 1
+        if redraw is not None and step == steps // 2:
+            commands = len(panel.commands)
+            redraw()
+            if (0x2E,) in panel.commands[commands:]:
+                return ["a redraw outside the band stopped the scroll"]
+        animate()
+        for page in range(2):
+            row = panel.ram[(BAND_PAGES[0] + page) * 128:(BAND_PAGES[0] + page + 1) * 128]
+            expected = bytes(tape(step + column, page) for column in range(128))
+            if bytes(row) != expected:
+                wrong = sum(a != b for a, b in zip(row, expected))
+                return [f"after {step} steps {wrong} columns of page {BAND_PAGES[0] + page} are wrong"]
+    return []
+
+def painter_problems() -> list:
+    from machine import I2C
+    from lib.ssd1306 import SSD1306_I2C
+    from lib.ui import Stat_Display_Painter
+
+    i2c = I2C(0)
+    display = SSD1306_I2C(128, 64, i2c)
+    painter = Stat_Display_Painter(display)
+    state = hostrender.debug_state()
+    state.eventTitles = TITLES
+    painter.draw(state)
+    print(f"scroll step {display.scroll_step_us()} us, frame {display.frame_us()} us")
+
+    def redraw():
+        state.messageCount += 1
+        painter.draw(state)
+
+    # every title scrolls through, and the first one comes round again
+    _, length = marquee(painter.ticker)
+    problems = scroll_problems(i2c.panel(), display, painter.ticker, painter.animate, length + 128, redraw)
+    print(f"stat painter: {i2c.panel().commands.count((0x2F,))} scroll starts, {i2c.transactions} I2C transactions")
+    return problems
+
+def carousel_problems() -> list:
+    from lib.displays import get_displays
+    from lib.settings import Settings
+
+    settings = Settings()
+    _, carousel = get_displays(settings, double_buffer=False)
+    display = carousel.display
+    panel = display.i2c.panel()
+    state = hostrender.debug_state()
+    state.eventTitles = TITLES
+    carousel.started = clock[0] // 1000
+    page_us = carousel.interval_ms * 1000
+
+    carousel.draw(state)  # the temperature page comes first
+    if panel.scrolling:
+        return ["the panel scrolls on the temperature page"]
+    clock[0] += page_us
+    carousel.draw(state)
+    stat_page = carousel.gates[carousel.shown].painter
+    problems = scroll_problems(panel, display, stat_page.ticker, carousel.animate, 300)
+    if problems:
+        return ["stat page: " + problem for problem in problems]
+
+    commands = len(panel.commands)
+    clock[0] = (carousel.started + 2 * carousel.interval_ms) * 1000
+    carousel.draw(state)
+    if (0x2E,) not in panel.commands[commands:] or panel.scrolling:
+        return ["the scroll was not stopped when the temperature page came back"]
+    if bytes(panel.ram) != bytes(display.buffer):
+        return ["the panel does not show the temperature page after the scroll stopped"]
+    print(f"carousel: {carousel.switches} switches, {panel.commands.count((0x2F,))} scroll starts")
+    return []
+
+def main():
+    install()
+    problems = painter_problems() + carousel_problems()
+    for problem in problems:
+        print("FAIL", problem)
+    if problems:
+        sys.exit(1)
+    print("The ticker scrolled every title through the band")
+
+if __name__ == "__main__":
+    main()